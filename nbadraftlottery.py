@@ -0,0 +1,145 @@
+# command line entry point: python -m nbadraftlottery simulate --mode r --iterations 1e7 --workers 8 --seed 42
+
+import argparse
+import json
+import sys
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from nbadraftlottery_functions import (load_league, parallel_lottery_counts, pick_statistics, start_instrumentation,
+                                       stop_instrumentation, write_chrome_trace)
+
+
+def simulate(mode: str, iterations: int, workers: Optional[int] = None, seed: Optional[int] = None,
+             out: Optional[str] = None, plot: Optional[str] = None,
+             league: Optional[str] = None) -> Tuple[np.ndarray, List[str]]:
+    """
+    Runs a whole simulation without any input() prompts, so it can be scripted, batched and timed. The lotteries
+    are simulated by parallel_lottery_counts(), and the counts can be saved to an .npz file and plotted to an
+    image file.
+    :param mode: the type of simulation, one of 'r', 'a', 'w', 'm' or 'o'
+    :param iterations: the number of lotteries to simulate
+    :param workers: the number of worker processes, defaults to the number of CPUs
+    :param seed: a seed for the run, so it can be reproduced
+    :param out: an .npz file to save the counts, team names and settings to
+    :param plot: an image file (e.g. .png or .svg) to save a heatmap of the pick probabilities to
+    :param league: a .json or .csv league file for load_league(), the 2021 lottery if not given
+    :return: the (teams x picks) count matrix and the list of team names
+
+    >>> counts, team_names = simulate('r', 1000, workers=1, seed=42)
+    >>> counts.shape, int(counts.sum())
+    ((14, 14), 14000)
+
+    >>> import os
+    >>> from nbadraftlottery_functions import LEAGUE_DIRECTORY
+    >>> league_path = os.path.join(LEAGUE_DIRECTORY, '1985.json')
+    >>> counts, team_names = simulate('r', 1000, workers=1, seed=42, league=league_path)
+    >>> counts.shape, team_names[0]
+    ((7, 7), 'New York Knicks')
+    """
+    if mode == 'o' and league is not None:
+        raise ValueError("the 'o' simulation is always the 1985 lottery, it can't take a league")
+    league_definition = load_league(league) if league is not None else None
+    counts, team_names = parallel_lottery_counts(iterations, mode, seed=seed, workers=workers,
+                                                 league=league_definition)
+    if out is not None:
+        settings = {'mode': mode, 'iterations': iterations}
+        if league_definition is not None:
+            settings['season'] = league_definition.season
+        if seed is not None:
+            settings['seed'] = seed
+        np.savez(out, counts=counts, team_names=np.array(team_names), **settings)
+    if plot is not None:
+        from nbadraftlottery_functions import team_data_plotter
+        team_data_plotter(counts, team_names, plot_type='heatmap', output_path=plot)
+    return counts, team_names
+
+
+def _positive_count(value):
+    """
+    Reads a number of lotteries from the command line, allowing forms like 1e7.
+    :param value: the command line value
+    :return: the number as an integer, at least 1
+
+    >>> _positive_count('1e3')
+    1000
+    """
+    count = int(float(value))
+    if count < 1:
+        raise argparse.ArgumentTypeError('must be at least 1, got %s' % value)
+    return count
+
+
+def _print_summary(counts, team_names, elapsed):
+    """
+    Prints each team's average pick and chance of the #1 pick, and how fast the lotteries were simulated.
+    :param counts: the (teams x picks) count matrix
+    :param team_names: the team for each row of the count matrix
+    :param elapsed: the number of seconds the simulation took
+    """
+    iterations = int(counts[0].sum())
+    stats = pick_statistics(counts)
+    print('%-25s %12s %10s' % ('Team', 'Average Pick', '#1 Pick'))
+    for row, team in enumerate(team_names):
+        print('%-25s %12.3f %10.4f' % (team, stats['mean'][row], counts[row, 0] / iterations))
+    print()
+    print('%d lotteries in %.2f seconds (%.0f lotteries per second)' % (iterations, elapsed, iterations / elapsed))
+
+
+def main(argv=None):
+    """
+    Parses the command line arguments and runs the requested command.
+    :param argv: the command line arguments, sys.argv if not given
+    :return: the exit status
+    """
+    parser = argparse.ArgumentParser(prog='python -m nbadraftlottery', description='NBA Draft Lottery simulator')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    simulate_parser = commands.add_parser('simulate', help='run a Monte Carlo simulation of the lottery')
+    simulate_parser.add_argument('--mode', choices=['r', 'a', 'w', 'm', 'o'], default='r',
+                                 help='r: 2021 lottery, a: balls drawn for every pick, w: wild-card team, '
+                                      'm: draft orders sampled from the exact pick odds, o: 1985 rigging conspiracy')
+    simulate_parser.add_argument('--iterations', type=_positive_count, default=100000,
+                                 help='number of lotteries to simulate, e.g. 1e7')
+    simulate_parser.add_argument('--workers', type=int, default=None, help='number of worker processes')
+    simulate_parser.add_argument('--seed', type=int, default=None, help='seed for a reproducible run')
+    simulate_parser.add_argument('--out', default=None, help='.npz file to save the pick counts to')
+    simulate_parser.add_argument('--plot', default=None, help='image file to save a heatmap of the results to')
+    simulate_parser.add_argument('--league', default=None,
+                                 help='.json or .csv file of the teams, odds and drawn picks to simulate '
+                                      '(see the leagues folder), the 2021 lottery if not given')
+    simulate_parser.add_argument('--profile', default=None,
+                                 help='.json file to save per-stage timers, draw counters and memory use to '
+                                      '(runs in one process unless --workers is given)')
+    simulate_parser.add_argument('--trace', default=None,
+                                 help='.json file to save a Chrome trace of the run to, for chrome://tracing or '
+                                      'ui.perfetto.dev')
+
+    args = parser.parse_args(argv)
+    if args.command == 'simulate':
+        if args.mode == 'o' and args.league is not None:
+            simulate_parser.error("--league can't be used with --mode o, which always simulates the 1985 lottery")
+        profiling = args.profile is not None or args.trace is not None
+        workers = 1 if profiling and args.workers is None else args.workers  # workers aren't instrumented
+        if profiling:
+            start_instrumentation(trace_memory=args.profile is not None)
+        start = time.perf_counter()
+        counts, team_names = simulate(args.mode, args.iterations, workers, args.seed, args.out, args.plot,
+                                      args.league)
+        elapsed = time.perf_counter() - start
+        if profiling:
+            report = stop_instrumentation()
+            if args.profile is not None:
+                with open(args.profile, 'w') as profile_file:
+                    json.dump({key: value for key, value in report.items() if key != 'events'}, profile_file,
+                              indent=2)
+            if args.trace is not None:
+                write_chrome_trace(report, args.trace)
+        _print_summary(counts, team_names, elapsed)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
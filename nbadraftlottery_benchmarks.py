@@ -0,0 +1,254 @@
+# performance benchmarks for the simulator: python nbadraftlottery_benchmarks.py --out results.json
+
+import argparse
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+
+import numpy as np
+
+import nbadraftlottery_functions as lottery
+
+SIMULATION_MODES = ('r', 'a', 'w', 'm', 'o')
+
+ITERATION_COUNTS = (1000, 10000, 100000, 1000000, 10000000)
+
+CHUNK_SIZE = 1000000  # the most lotteries simulated at once, so 1e7 lotteries don't have to fit in memory
+
+_IMPORT_TIMER = '''
+import sys, time
+start = time.perf_counter()
+import numpy
+numpy_done = time.perf_counter()
+import {module}
+done = time.perf_counter()
+print(numpy_done - start, done - numpy_done, 'seaborn' in sys.modules or 'matplotlib' in sys.modules)
+'''
+
+
+def import_time_benchmark(module='nbadraftlottery_functions', repeats=5):
+    """
+    Measures how long a module takes to import in a fresh interpreter, keeping the best of several runs. numpy is
+    timed separately since the simulation can't run without it, and the result also says whether seaborn or
+    matplotlib were loaded along the way.
+    :param module: the name of the module to import
+    :param repeats: the number of fresh interpreters to time
+    :return: a dictionary with the best 'numpy_seconds', 'module_seconds' (on top of numpy), 'total_seconds' and
+             whether 'plotting_loaded'
+
+    >>> result = import_time_benchmark(repeats=1)
+    >>> result['plotting_loaded']
+    False
+    """
+    runs = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', _IMPORT_TIMER.format(module=module)], capture_output=True,
+                                text=True, check=True).stdout.split()
+        runs.append((float(output[0]), float(output[1]), output[2] == 'True'))
+    numpy_seconds = min(run[0] for run in runs)
+    module_seconds = min(run[1] for run in runs)
+    return {'module': module, 'numpy_seconds': numpy_seconds, 'module_seconds': module_seconds,
+            'total_seconds': numpy_seconds + module_seconds, 'plotting_loaded': any(run[2] for run in runs)}
+
+
+def _run_mode(simulation_type, iterations, seed, chunk_size=CHUNK_SIZE):
+    """
+    Simulates lotteries of the given mode in chunks in this process, like the command line does, and adds up their
+    pick counts.
+    :param simulation_type: one of SIMULATION_MODES
+    :param iterations: the number of lotteries to simulate
+    :param seed: a seed for the run
+    :param chunk_size: the number of lotteries simulated at a time
+    """
+    chunks = lottery._lottery_chunks(iterations, simulation_type, seed, chunk_size)
+    sum(counts for counts, team_names in lottery._map_lottery_chunks(chunks, workers=1))
+
+
+def mode_benchmark(simulation_type, iterations, repeats=3, seed=0, chunk_size=CHUNK_SIZE):
+    """
+    Measures how many lotteries per second one mode simulates, keeping the best of several runs, and the peak
+    memory traced by tracemalloc during a separate run (numpy reports its arrays to tracemalloc). The lotteries are
+    simulated chunk_size at a time, so the peak memory is that of one chunk.
+    :param simulation_type: one of SIMULATION_MODES
+    :param iterations: the number of lotteries to simulate
+    :param repeats: the number of timed runs
+    :param seed: a seed for the runs, so each repeat simulates the same lotteries
+    :param chunk_size: the number of lotteries simulated at a time
+    :return: a dictionary with the 'mode', 'iterations', 'chunk_size', the best 'seconds' and
+             'lotteries_per_second', and 'peak_bytes'
+
+    >>> result = mode_benchmark('r', 1000, repeats=1)
+    >>> result['lotteries_per_second'] > 0 and result['peak_bytes'] > 14000
+    True
+    """
+    _run_mode(simulation_type, min(iterations, 1000), seed)  # warms up caches and lazy imports
+    seconds = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        _run_mode(simulation_type, iterations, seed, chunk_size)
+        seconds = min(seconds, time.perf_counter() - start)
+
+    tracemalloc.start()
+    _run_mode(simulation_type, iterations, seed, chunk_size)
+    peak_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'mode': simulation_type, 'iterations': iterations, 'chunk_size': chunk_size, 'seconds': seconds,
+            'lotteries_per_second': iterations / seconds, 'peak_bytes': peak_bytes}
+
+
+def _best_time(function, number, repeats):
+    """
+    Times number calls of a function, repeats times, and keeps the fastest.
+    :param function: a function that takes no arguments
+    :param number: the number of calls in each run
+    :param repeats: the number of runs
+    :return: the best number of seconds per call
+    """
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def helper_benchmarks(number=200, repeats=3):
+    """
+    Measures the cost of one call of each of the helper functions the simulator notebook calls for every lottery,
+    and of the functions that turn results into statistics.
+    :param number: the number of calls in each timed run
+    :param repeats: the number of timed runs
+    :return: a dictionary that maps each helper to its best number of seconds per call
+
+    >>> sorted(helper_benchmarks(number=2, repeats=1))[:3]
+    ['lottery_results', 'odds_assigner', 'pick_counts_100000']
+    """
+    odds = lottery.odds_creator('r', 1, None, None)[0]
+    ping_pong_combinations, discarded_combination = lottery.combinations_creator('r')
+    team_combinations, combination_lookup = lottery.odds_assigner(ping_pong_combinations, discarded_combination,
+                                                                  odds)
+    team_names = list(team_combinations)
+    drawn_combination = list(ping_pong_combinations[0])
+    results = lottery.lottery_results(team_combinations, discarded_combination, 'r', combination_lookup,
+                                      realtime=False, verbose=False)
+    legacy_results = {team: [pick] * 100 for team, pick in ((team, results[team][0]) for team in results)}
+    picks = lottery.simulate_lotteries(100000, 'r', seed=0)[0]
+    counts = lottery.pick_counts(picks)
+
+    def silenced(function):
+        def run():
+            with redirect_stdout(io.StringIO()):
+                function()
+        return run
+
+    helpers = {
+        'odds_assigner': lambda: lottery.odds_assigner(ping_pong_combinations, discarded_combination, odds),
+        'team_selector': lambda: lottery.team_selector(drawn_combination, discarded_combination, team_combinations),
+        'team_selector_lookup': lambda: lottery.team_selector(drawn_combination, discarded_combination,
+                                                              team_combinations, combination_lookup),
+        'lottery_results': lambda: lottery.lottery_results(team_combinations, discarded_combination, 'r',
+                                                           combination_lookup, realtime=False, verbose=False),
+        'team_stats_calculator': lambda: lottery.team_stats_calculator(legacy_results),
+        'team_stats_calculator_matrix': lambda: lottery.team_stats_calculator(results, team_names, counts.copy()),
+        'pick_counts_100000': lambda: lottery.pick_counts(picks),
+        'pick_statistics': lambda: lottery.pick_statistics(counts),
+        'team_sim_data': silenced(lambda: lottery.team_sim_data(counts, 100000, 'r', team_names)),
+    }
+    return {name: _best_time(function, number, repeats) for name, function in helpers.items()}
+
+
+def run_benchmarks(modes=SIMULATION_MODES, iteration_counts=ITERATION_COUNTS, repeats=3, chunk_size=CHUNK_SIZE):
+    """
+    Runs the whole benchmark suite: the import time, every mode at every iteration count and the helpers.
+    :param modes: the simulation modes to measure
+    :param iteration_counts: the numbers of lotteries to measure each mode at
+    :param repeats: the number of timed runs of each measurement
+    :param chunk_size: the number of lotteries simulated at a time
+    :return: a dictionary of the results and of the machine they were measured on, ready to be saved as JSON
+    """
+    return {'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                        'platform': platform.platform(), 'cpu_count': os.cpu_count()},
+            'import': import_time_benchmark(repeats=repeats),
+            'modes': [mode_benchmark(mode, iterations, repeats, chunk_size=chunk_size)
+                      for mode in modes for iterations in iteration_counts],
+            'helpers': helper_benchmarks(repeats=repeats)}
+
+
+def compare_to_baseline(results, baseline, tolerance=0.25):
+    """
+    Compares benchmark results to a stored baseline from run_benchmarks(). A mode regresses if it simulates more than
+    tolerance fewer lotteries per second, and a helper or the import regresses if it takes more than tolerance
+    longer. Measurements that aren't in both are skipped.
+    :param results: the results of run_benchmarks()
+    :param baseline: the stored results to compare against
+    :param tolerance: the fraction a measurement may get worse by before it counts as a regression
+    :return: a list of (name, baseline value, new value) tuples, one for each regression
+
+    >>> baseline = {'modes': [{'mode': 'r', 'iterations': 1000, 'lotteries_per_second': 100.0}],
+    ...             'helpers': {'odds_assigner': 0.001}}
+    >>> results = {'modes': [{'mode': 'r', 'iterations': 1000, 'lotteries_per_second': 50.0}],
+    ...            'helpers': {'odds_assigner': 0.001}}
+    >>> compare_to_baseline(results, baseline)
+    [('mode r x 1000 lotteries per second', 100.0, 50.0)]
+    """
+    regressions = []
+    baseline_modes = {(run['mode'], run['iterations']): run['lotteries_per_second'] for run in baseline['modes']}
+    for run in results['modes']:
+        old_rate = baseline_modes.get((run['mode'], run['iterations']))
+        if old_rate is not None and run['lotteries_per_second'] < old_rate * (1 - tolerance):
+            regressions.append(('mode %s x %d lotteries per second' % (run['mode'], run['iterations']), old_rate,
+                                run['lotteries_per_second']))
+
+    timings = [(name, baseline['helpers'].get(name), seconds) for name, seconds in results['helpers'].items()]
+    if 'import' in results and 'import' in baseline:
+        timings.append(('import seconds', baseline['import']['module_seconds'], results['import']['module_seconds']))
+    for name, old_seconds, new_seconds in timings:
+        if old_seconds is not None and new_seconds > old_seconds * (1 + tolerance):
+            regressions.append((name, old_seconds, new_seconds))
+    return regressions
+
+
+def main(argv=None):
+    """
+    Runs the benchmarks from the command line, saves them as JSON and compares them to a baseline if one is given.
+    :param argv: the command line arguments, sys.argv if not given
+    :return: the exit status, 1 if anything regressed
+    """
+    parser = argparse.ArgumentParser(prog='python nbadraftlottery_benchmarks.py',
+                                     description='NBA Draft Lottery simulator benchmarks')
+    parser.add_argument('--modes', nargs='+', choices=SIMULATION_MODES, default=list(SIMULATION_MODES))
+    parser.add_argument('--iterations', nargs='+', type=lambda value: int(float(value)),
+                        default=list(ITERATION_COUNTS), help='numbers of lotteries to measure, e.g. 1e3 1e5')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs of each measurement')
+    parser.add_argument('--chunk-size', type=lambda value: int(float(value)), default=CHUNK_SIZE,
+                        help='most lotteries simulated at once, e.g. 1e6')
+    parser.add_argument('--out', default=None, help='.json file to save the results to')
+    parser.add_argument('--baseline', default=None, help='.json file of earlier results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='slowdown allowed before failing, e.g. 0.25')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.modes, args.iterations, args.repeats, args.chunk_size)
+    if args.out is not None:
+        with open(args.out, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline is not None:
+        with open(args.baseline) as baseline_file:
+            regressions = compare_to_baseline(results, json.load(baseline_file), args.tolerance)
+        for name, old_value, new_value in regressions:
+            print('REGRESSION %s: %.6g -> %.6g' % (name, old_value, new_value))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,243 @@
 # project setup
 
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
-from itertools import combinations, permutations
-from collections import Counter
+from itertools import combinations, product
+from collections import Counter, namedtuple
+import hashlib
+import json
+import os
 import random
 import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, wraps
+from math import comb
+from statistics import NormalDist
+from types import MappingProxyType
 from numpy.random import multinomial
 
 
+WILD_CARD_PLAYOFF_TEAMS = ['Charlotte Hornets', 'Boston Celtics', 'Miami Heat', 'Atlanta Hawks', 'New York Knicks',
+                           'Milwaukee Bucks', 'Brooklyn Nets', 'Philadelphia 76ers',
+                           'Utah Jazz', 'Pheonix Suns', 'Los Angeles Clippers', 'Denver Nuggets', 'Dallas Mavericks',
+                           'Portland Trail Blazers', 'Los Angeles Lakers',
+                           'Memphis Grizzlies']
+
+LeagueDefinition = namedtuple('LeagueDefinition', ['season', 'team_ids', 'team_names', 'short_names', 'team_odds',
+                                                   'drawn_picks', 'excluded_combinations'])
+
+LotteryConfig = namedtuple('LotteryConfig', ['simulation_type', 'team_names', 'short_names', 'team_odds',
+                                             'drawn_picks', 'ping_pong_combinations', 'excluded_combinations',
+                                             'combination_lookup', 'combination_counts'])
+
+_BINOMIALS = np.array([[comb(m, j) for j in range(5)] for m in range(14)], dtype=np.int16)
+
+
+def load_league(path, drawn_picks=4, excluded_combinations=((11, 12, 13, 14),)):
+    """
+    Loads the definition of a lottery from a .json or .csv file, so that any season or lottery format can run
+    through the same simulation engine without editing any code. A .json file holds the whole definition:
+    {"season": "2021", "drawn_picks": 4, "excluded_combinations": [[11, 12, 13, 14]], "teams": [{"team_id": "HOU",
+    "name": "Houston Rockets", "short_name": "Rockets", "odds": 0.14}, ...]}, with the teams in order of the
+    standings. A .csv file has a header row and one row per team with the columns team_id, name, short_name and
+    odds, and takes the number of drawn picks and the excluded combinations from the arguments instead.
+    :param path: the path of the .json or .csv file
+    :param drawn_picks: the number of picks drawn with ping pong balls, used for .csv files
+    :param excluded_combinations: the four ball combinations that aren't assigned to any team, used for .csv files
+    :return: a LeagueDefinition, made of tuples so it can be used as a cache key by lottery_config()
+
+    >>> league = load_league(os.path.join(LEAGUE_DIRECTORY, '2021.json'))
+    >>> league.team_ids[:3], league.drawn_picks, league.excluded_combinations
+    (('HOU', 'MIN', 'DET'), 4, ((11, 12, 13, 14),))
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as directory:
+    ...     path = os.path.join(directory, 'draw_all.csv')
+    ...     with open(path, 'w') as league_file:
+    ...         _ = league_file.write('team_id,name,short_name,odds\\nAAA,Team A,A,0.6\\nBBB,Team B,B,0.4\\n')
+    ...     load_league(path, drawn_picks=2).team_odds
+    (0.6, 0.4)
+    """
+    season = os.path.splitext(os.path.basename(path))[0]
+    if path.lower().endswith('.csv'):
+        import csv
+        with open(path, newline='') as league_file:
+            teams = list(csv.DictReader(league_file))
+    else:
+        with open(path) as league_file:
+            definition = json.load(league_file)
+        teams = definition['teams']
+        season = str(definition.get('season', season))
+        drawn_picks = definition.get('drawn_picks', drawn_picks)
+        excluded_combinations = definition.get('excluded_combinations', excluded_combinations)
+
+    team_ids = tuple(str(team['team_id']) for team in teams)
+    team_odds = tuple(float(team['odds']) for team in teams)
+    excluded_combinations = tuple(tuple(sorted(int(ball) for ball in combination))
+                                  for combination in excluded_combinations)
+    if not 0 < len(teams) <= 127:
+        raise ValueError('a league needs between 1 and 127 teams')
+    if len(set(team_ids)) != len(team_ids):
+        raise ValueError('every team in a league needs its own team_id')
+    if min(team_odds) < 0 or sum(team_odds) > 1 + 1e-9:
+        raise ValueError('the odds of a league must be non-negative and add up to at most 1')
+    if not 1 <= int(drawn_picks) <= len(teams):
+        raise ValueError('the number of drawn picks must be between 1 and the number of teams')
+    for combination in excluded_combinations:
+        if len(set(combination)) != 4 or combination[0] < 1 or combination[-1] > 14:
+            raise ValueError('excluded combinations must be four different balls numbered 1 through 14')
+
+    return LeagueDefinition(season, team_ids, tuple(team['name'] for team in teams),
+                            tuple(team.get('short_name') or team['name'] for team in teams), team_odds,
+                            int(drawn_picks), excluded_combinations)
+
+
+LEAGUE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leagues')
+
+LEAGUE_2021 = load_league(os.path.join(LEAGUE_DIRECTORY, '2021.json'))
+
+LEAGUE_1985 = load_league(os.path.join(LEAGUE_DIRECTORY, '1985.json'))
+
+LOTTERY_1985_TEAMS = list(LEAGUE_1985.team_names)
+
+TEAM_SHORT_NAMES = dict(zip(LEAGUE_1985.team_names + LEAGUE_2021.team_names,
+                            LEAGUE_1985.short_names + LEAGUE_2021.short_names))
+
+
+_instrumentation = None  # the record of the current instrumented run, or None when instrumentation is off
+
+_NO_STAGE = nullcontext()
+
+
+def start_instrumentation(trace_memory=False, max_events=100000):
+    """
+    Turns on the instrumentation layer. Until stop_instrumentation() is called, every stage of the lottery pipeline
+    (generating combinations, assigning odds, drawing balls, selecting teams, aggregating results) adds its time to
+    a per-stage timer and records a trace event, and the draws are counted: how many were attempted, how many were
+    rejected because the combination wasn't assigned to anyone (the discarded combination or a leftover one) and
+    how many because the team already had a pick. When instrumentation is off, each stage only checks one global,
+    so the cost is negligible. Stages that run in worker processes aren't recorded, so profile with workers=1.
+    :param trace_memory: whether tracemalloc also records the bytes allocated by each stage (this slows the run)
+    :param max_events: the most trace events to keep, the timers and counters keep counting after that
+    """
+    global _instrumentation
+    if trace_memory:
+        tracemalloc.start()
+    _instrumentation = {'stages': {}, 'counters': Counter(), 'events': [], 'max_events': max_events,
+                        'trace_memory': trace_memory, 'start': time.perf_counter(),
+                        'start_bytes': tracemalloc.get_traced_memory()[0] if trace_memory else 0}
+
+
+def stop_instrumentation():
+    """
+    Turns off the instrumentation layer and summarizes the run. The stage timers include the time of any stages
+    nested inside them.
+    :return: a dictionary with the total 'seconds', the number of 'lotteries' and 'lotteries_per_second', the
+             'counters', the share of draws rejected as 'rejection_rate', the calls, seconds and bytes of each of
+             the 'stages', the 'allocated_bytes' and 'peak_bytes' traced by tracemalloc, and the trace 'events'
+
+    >>> start_instrumentation()
+    >>> picks, teams = simulate_lotteries(1000, 'a', seed=1)
+    >>> report = stop_instrumentation()
+    >>> report['lotteries'], report['counters']['draws'] >= 14000, 'draw' in report['stages']
+    (1000, True, True)
+    """
+    global _instrumentation
+    record, _instrumentation = _instrumentation, None
+    if record is None:
+        raise ValueError('instrumentation is not running')
+    seconds = time.perf_counter() - record['start']
+    allocated_bytes = peak_bytes = None
+    if record['trace_memory']:
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        allocated_bytes = current_bytes - record['start_bytes']
+        tracemalloc.stop()
+
+    counters = dict(record['counters'])
+    lotteries = counters.pop('lotteries', 0)
+    draws = counters.get('draws', 0)
+    rejected = counters.get('rejected_unassigned', 0) + counters.get('rejected_repeat', 0)
+    return {'seconds': seconds, 'lotteries': lotteries, 'lotteries_per_second': lotteries / seconds,
+            'counters': counters, 'rejection_rate': rejected / draws if draws else 0.0, 'stages': record['stages'],
+            'allocated_bytes': allocated_bytes, 'peak_bytes': peak_bytes,
+            'events': [(name, start - record['start'], duration) for name, start, duration in record['events']]}
+
+
+def write_chrome_trace(report, path):
+    """
+    Saves the trace events of a report from stop_instrumentation() in the Chrome trace event format, which can be
+    opened in chrome://tracing or https://ui.perfetto.dev to see every stage of the run on a timeline.
+    :param report: a report from stop_instrumentation()
+    :param path: the .json file to write
+    """
+    events = [{'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': duration * 1e6, 'pid': os.getpid(), 'tid': 0}
+              for name, start, duration in report['events']]
+    events.append({'name': 'counters', 'ph': 'C', 'ts': report['seconds'] * 1e6, 'pid': os.getpid(),
+                   'args': dict(report['counters'], lotteries=report['lotteries'])})
+    with open(path, 'w') as trace_file:
+        json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, trace_file)
+
+
+@contextmanager
+def _timed_stage(name):
+    """
+    Times one stage of the pipeline and records it in the current instrumented run.
+    :param name: the name of the stage
+    """
+    record = _instrumentation
+    start_bytes = tracemalloc.get_traced_memory()[0] if record['trace_memory'] else 0
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        stage = record['stages'].setdefault(name, {'calls': 0, 'seconds': 0.0, 'bytes': 0})
+        stage['calls'] += 1
+        stage['seconds'] += duration
+        if record['trace_memory']:
+            stage['bytes'] += tracemalloc.get_traced_memory()[0] - start_bytes
+        if len(record['events']) < record['max_events']:
+            record['events'].append((name, start, duration))
+
+
+def _stage(name):
+    """
+    A context manager that times a stage of the pipeline when instrumentation is on and does nothing otherwise.
+    :param name: the name of the stage
+    :return: a context manager
+    """
+    if _instrumentation is None:
+        return _NO_STAGE
+    return _timed_stage(name)
+
+
+def _timed(name):
+    """
+    A decorator that times every call of a function as a stage of the pipeline when instrumentation is on.
+    :param name: the name of the stage
+    :return: the decorator
+    """
+    def decorator(function):
+        @wraps(function)
+        def timed_function(*args, **kwargs):
+            if _instrumentation is None:
+                return function(*args, **kwargs)
+            with _timed_stage(name):
+                return function(*args, **kwargs)
+        return timed_function
+    return decorator
+
+
+def _count(**counts):
+    """
+    Adds to the counters of the current instrumented run, if there is one.
+    :param counts: the counters to add to, such as draws=10
+    """
+    if _instrumentation is not None:
+        _instrumentation['counters'].update({name: int(value) for name, value in counts.items()})
+
+
+@_timed('combinations')
 def combinations_creator(simulation_type):
     """
     We generate a list of combinations of 14 choose 4. Each item in this list represents a possible combination
@@ -41,17 +269,22 @@ def combinations_creator(simulation_type):
         return ball_combinations, excluded_combination
 
 
-def odds_creator(simulation_type, iteration_counter, playoff_team, wild_card_odds):
+@_timed('odds')
+def odds_creator(simulation_type, iteration_counter, playoff_team, wild_card_odds, league=None):
     """
     Each team is given their respective odds of obtaining the #1 pick
     based on their position in standings/type of simulation. If it is a regular simulation, the
     regular odds are given, if it is a wild-card simulation, there is
     another team added with a random normal variable that determines their odds, and for a multinomial simulation,
-    the odds are represented as an array for each pick for each team.
+    the odds are represented as an array for each pick for each team, worked out by exact_pick_probabilities().
+    The wild-card team is drawn by wild_card_draw(), seeded from numpy's global random state, and announced only
+    when no playoff team is passed in, so the same team can be passed back in on every later iteration, and a
+    headless caller can pass in its own.
     :param simulation_type: a user inputted string expressing what type of simulation this is
     :param iteration_counter: represents which iteration of the simulation the program is on
-    :param playoff_team: represents the wild-card playoff team
+    :param playoff_team: represents the wild-card playoff team, drawn here if None
     :param wild_card_odds: represents the odds of the wild-card playoff team
+    :param league: the LeagueDefinition of the teams and their odds, the 2021 lottery if not given
     :return: a dictionary with key/value pairs being each team and their odds, and a playoff team and their odds
 
     >>> odds, playoff_selected_team, playoff_odds = odds_creator('r', 1, None, None)
@@ -65,122 +298,166 @@ def odds_creator(simulation_type, iteration_counter, playoff_team, wild_card_odd
     >>> odds, playoff_selected_team, playoff_odds = odds_creator('a', 100, None, None)
     >>> len(odds) == 14
     True
+
+    >>> import contextlib, io
+    >>> draws = []
+    >>> for _ in range(2):
+    ...     np.random.seed(6)
+    ...     with contextlib.redirect_stdout(io.StringIO()):
+    ...         draws.append(odds_creator('w', 1, None, None)[1:])
+    >>> draws[0] == draws[1]
+    True
+
+    >>> odds, playoff_selected_team, playoff_odds = odds_creator('w', 1, 'Miami Heat', 0.05)
+    >>> len(odds), odds['Miami Heat'], round(sum(odds.values()), 9)
+    (15, 0.05, 1.0)
+
+    >>> odds, playoff_selected_team, playoff_odds = odds_creator('r', 1, None, None, LEAGUE_1985)
+    >>> list(odds)[0], len(odds)
+    ('New York Knicks', 7)
     """
+    if league is None:
+        league = LEAGUE_2021
+
     if simulation_type == 'r' or simulation_type == 'w' or simulation_type == 'a':
-        rockets_odds = 0.14
-        timberwolves_odds = 0.14
-        pistons_odds = 0.14
-        magic_odds = 0.125
-        thunder_odds = 0.105
-        cavaliers_odds = 0.09
-        kings_odds = 0.075
-        raptors_odds = 0.06
-        bulls_odds = 0.045
-        wizards_odds = 0.03
-        pelicans_odds = 0.02
-        pacers_odds = 0.015
-        warriors_odds = 0.01
-        spurs_odds = 0.005
+        team_odds = list(league.team_odds)
 
         if simulation_type == 'w':
-            if iteration_counter == 1:
-                mu, sigma = 0.07, 0.035
-                wild_card_odds = np.round(np.random.normal(mu, sigma, 1),
-                                          3)  # using a normal dist. to determine odds of wild card team
-                while wild_card_odds <= 0 or wild_card_odds >= 0.14:  # we should not have a wild card team with non-positive odds or odds greater than the top possible odds
-                    wild_card_odds = np.round(np.random.normal(mu, sigma, 1), 3)
-            randomizer = random.randint(1, 5)
-            if randomizer == 1:
-                rockets_odds -= wild_card_odds
-            elif randomizer == 2:
-                timberwolves_odds -= wild_card_odds
-            elif randomizer == 3:
-                pistons_odds -= wild_card_odds
-            elif randomizer == 4:
-                magic_odds -= wild_card_odds
-            else:
-                thunder_odds -= wild_card_odds
+            if playoff_team is None:
+                # seeded from numpy's global state, so np.random.seed() still makes the wild card reproducible
+                playoff_team, wild_card_odds = wild_card_draw(np.random.randint(2 ** 31), league)
+                print('The Wild Card Playoff Team selected to participate in the NBA Draft Lottery is the:',
+                      playoff_team)
+                print('The', playoff_team, 'will enter the NBA Draft Lottery with:', str(wild_card_odds),
+                      'odds of obtaining the #1 pick')
+            randomizer = random.choice(_wild_card_donors(team_odds, wild_card_odds))
+            team_odds[randomizer] -= wild_card_odds  # one of the bottom five teams gives up the wild card odds
 
     elif simulation_type == 'm':
-        rockets_odds = [0.14, 0.134, 0.127, 0.12, 0.479, 0, 0, 0, 0, 0, 0, 0, 0,
-                        0]  # from left to right, these odds represent each team's chances of obtaining picks 1-14
-        timberwolves_odds = [0.14, 0.134, 0.127, 0.120, 0.278, 0.20, 0, 0, 0, 0, 0, 0, 0, 0]
-        pistons_odds = [0.14, 0.134, 0.127, 0.120, 0.148, 0.260, 0.07, 0, 0, 0, 0, 0, 0, 0]
-        magic_odds = [0.125, 0.122, 0.119, 0.115, 0.072, 0.257, 0.167, 0.022, 0, 0, 0, 0, 0, 0]
-        thunder_odds = [0.105, 0.105, 0.106, 0.105, 0.022, 0.196, 0.267, 0.087, 0.006, 0, 0, 0, 0, 0]
-        cavaliers_odds = [0.09, 0.092, 0.094, 0.096, 0, 0.086, 0.297, 0.206, 0.037, 0.002, 0, 0, 0, 0]
-        kings_odds = [0.075, 0.078, 0.081, 0.085, 0, 0, 0.197, 0.341, 0.129, 0.013, 0, 0, 0, 0]
-        raptors_odds = [0.06, 0.063, 0.067, 0.072, 0, 0, 0, 0.345, 0.321, 0.067, 0.004, 0, 0, 0]
-        bulls_odds = [0.045, 0.048, 0.052, 0.057, 0, 0, 0, 0, 0.507, 0.259, 0.03, 0.001, 0, 0]
-        wizards_odds = [0.03, 0.033, 0.036, 0.04, 0, 0, 0, 0, 0, 0.659, 0.190, 0.012, 0, 0]
-        pelicans_odds = [0.02, 0.022, 0.024, 0.028, 0, 0, 0, 0, 0, 0, 0.776, 0.126, 0.004, 0]
-        pacers_odds = [0.015, 0.017, 0.019, 0.021, 0, 0, 0, 0, 0, 0, 0, 0.861, 0.067, 0.001]
-        warriors_odds = [0.01, 0.011, 0.012, 0.014, 0, 0, 0, 0, 0, 0, 0, 0, 0.929, 0.023]
-        spurs_odds = [0.005, 0.006, 0.006, 0.007, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0.976]
-
-    odds_dictionary = {'Houston Rockets': rockets_odds, 'Minnesota Timberwolves': timberwolves_odds,
-                       'Detroit Pistons': pistons_odds,
-                       'Orlando Magic': magic_odds, 'Oklahoma City Thunder': thunder_odds,
-                       'Cleveland Cavaliers': cavaliers_odds,
-                       'Sacramento Kings': kings_odds, 'Toronto Raptors': raptors_odds, 'Chicago Bulls': bulls_odds,
-                       'Washington Wizards': wizards_odds,
-                       'New Orleans Pelicans': pelicans_odds, 'Indiana Pacers': pacers_odds,
-                       'Golden State Warriors': warriors_odds, 'San Antonio Spurs': spurs_odds}
+        # from left to right, these odds represent each team's chances of obtaining picks 1-14
+        team_odds = exact_pick_probabilities(list(league.team_odds), league.drawn_picks).tolist()
 
-    if simulation_type == 'w':
-        if iteration_counter == 1:
-            playoff_teams = ['Charlotte Hornets', 'Boston Celtics', 'Miami Heat', 'Atlanta Hawks', 'New York Knicks',
-                             'Milwaukee Bucks', 'Brooklyn Nets', 'Philadelphia 76ers',
-                             'Utah Jazz', 'Pheonix Suns', 'Los Angeles Clippers', 'Denver Nuggets', 'Dallas Mavericks',
-                             'Portland Trail Blazers', 'Los Angeles Lakers',
-                             'Memphis Grizzlies']
-            playoff_team_selector = random.randint(0, len(playoff_teams) - 1)
-            playoff_team = playoff_teams[playoff_team_selector]
-            print('The Wild Card Playoff Team selected to participate in the NBA Draft Lottery is the:', playoff_team)
-            print('The', playoff_team, 'will enter the NBA Draft Lottery with:', str(wild_card_odds),
-                  'odds of obtaining the #1 pick')
+    odds_dictionary = dict(zip(league.team_names, team_odds))
 
+    if simulation_type == 'w':
         odds_dictionary[playoff_team] = wild_card_odds
 
     return odds_dictionary, playoff_team, wild_card_odds
 
 
+def combination_rank(ball_combination):
+    """
+    This function gives the position of a four ball combination in the list made by combinations_creator(), no
+    matter what order the balls were drawn in. The balls are sorted once and the lexicographic rank of the sorted
+    combination is added up from a small table of binomial coefficients, so there is no need to look through
+    permutations. It also works on an array of draws, one combination per row.
+    :param ball_combination: an array representing a four number combination, or an array of shape (draws, 4)
+    :return: the rank (0 through 1000) of the combination, or an array of ranks for an array of combinations
+
+    >>> combos, discarded = combinations_creator('r')
+    >>> int(combination_rank([4, 1, 3, 2])) == combos.index((1, 2, 3, 4))
+    True
+
+    >>> int(combination_rank(discarded)) == combos.index(discarded)
+    True
+
+    >>> combination_rank(np.array([[1, 2, 3, 4], [14, 13, 12, 11]])).tolist()
+    [0, 1000]
+    """
+    balls = np.sort(np.asarray(ball_combination), axis=-1) - 1
+    return 1000 - _BINOMIALS[13 - balls, np.arange(4, 0, -1)].sum(axis=-1)
+
+
+def _combination_lookup(teams_combinations):
+    """
+    Builds the compact index used by team_selector(): an int8 array with one entry per combination rank that holds
+    the position of the team (in the order of teams_combinations) that owns the combination, or -1 if nobody does.
+    :param teams_combinations: a dictionary that maps each team to a set of combinations they've been assigned to
+    :return: an int8 array of length 1001 that maps each combination rank to a team index
+    """
+    combination_lookup = np.full(1001, -1, dtype=np.int8)
+    for team_index, team in enumerate(teams_combinations):
+        combination_lookup[combination_rank(teams_combinations[team])] = team_index
+    return combination_lookup
+
+
+def _combination_count(odds, assignable):
+    """
+    The number of combinations a team with the given odds is assigned: int(odds * assignable), after rounding away
+    floating point error first, so that odds like 0.105 - 0.005 = 0.09999999999999999 still get 100 combinations
+    instead of 99. Odds that really fall between two counts, like 1/7, are still truncated.
+    :param odds: a team's odds of obtaining the #1 pick
+    :param assignable: the number of combinations that can be assigned
+    :return: the number of combinations the team gets
+
+    >>> _combination_count(0.105 - 0.005, 1000), _combination_count(1 / 7, 1000)
+    (100, 142)
+    """
+    return int(round(float(odds) * assignable, 6))
+
+
+@_timed('odds_assigner')
 def odds_assigner(ping_pong_combinations, discarded_combination, odds_dict):
     """
     This function assigns a certain number of combinations of ping pong balls to each team based on their odds.
-    We temporarily remove the unassigned ping pong ball from the list of ping pong ball combinations and
-    re-assign it back after. Then, we generate 1000 random numbers from 0 through 1000. Finally, we assign each
-    team their odds from this number
+    Every combination except the unassigned one is shuffled once, and then each team is given the next
+    int(odds * 1000) combinations of the shuffled list, so there is no sampling and removing one combination at a
+    time. The list of combinations that is passed in is left untouched, and the assignment that is returned can't be
+    changed, so it is safe to cache and reuse.
     :param ping_pong_combinations: an array containing all the combinations of 14 choose 4 ping pong balls
     :param discarded_combination: the one combination that is not assigned to a team
     :param odds_dict: A dictionary that maps each their to their respective odds
-    :return: a resulting dictionary that maps each team to their combinations
+    :return: a resulting read-only dictionary that maps each team to a tuple of their combinations, and a read-only
+             int8 array that maps each combination rank (see combination_rank()) to the index of its team in that
+             dictionary, with -1 for the discarded combination
+
+    >>> combos, discarded = combinations_creator('r')
+    >>> odds, playoff_selected_team, playoff_odds = odds_creator('r', 1, None, None)
+    >>> team_combinations, combination_lookup = odds_assigner(combos, discarded, odds)
+    >>> len(combos) == 1001 and sum(len(team_combinations[i]) for i in team_combinations) == 1000
+    True
+
+    >>> int(combination_lookup[combination_rank(discarded)])
+    -1
     """
-    ping_pong_combinations.remove(discarded_combination)
-    random_indices = random.sample(range(len(ping_pong_combinations)), 1000)
-    random_indices_length = len(random_indices)
+    assignable = [j for j in ping_pong_combinations if j != discarded_combination]
+    random_combinations = random.sample(assignable, len(assignable))
     combinations_dictionary = {}
+    start = 0
     for i in odds_dict.keys():
-        sample = int(odds_dict[i] * random_indices_length)
-        draw = random.sample(random_indices, sample)
-        for j in draw:
-            if draw[0] == j:
-                combinations_dictionary[i] = [ping_pong_combinations[j]]
-            else:
-                combinations_dictionary[i].append(ping_pong_combinations[j])
-            random_indices.remove(j)
-    ping_pong_combinations.append(discarded_combination)
-    return combinations_dictionary
+        sample = _combination_count(odds_dict[i], len(random_combinations))
+        if sample > 0:
+            combinations_dictionary[i] = tuple(random_combinations[start:start + sample])
+        start += sample
+    combination_lookup = _combination_lookup(combinations_dictionary)
+    combination_lookup.setflags(write=False)
+    return MappingProxyType(combinations_dictionary), combination_lookup
 
 
-def ball_combination_picker():
+@_timed('ball_draw')
+def ball_combination_picker(realtime=True, verbose=True):
     """
     This function simulates the selection of combinations of balls as done in the NBA Draft Lottery.
     First, a list of numbers from 1-15 is created. Then, the balls are mixed for 1/100000 of the time they
     are mixed in the actual NBA Draft Lottery. during this time, the list is shuffled and a random number is
     chosen from the list. This represents the first ball drawn. This process is repeated until 4 balls are drawn.
+    When realtime is False the mixing is skipped, since all it does is make the draw uniform, and the four balls
+    are drawn at once without replacement.
+    :param realtime: whether the balls are mixed on the clock before each ball is chosen, as on lottery night
+    :param verbose: whether the shuffling and the chosen balls are printed
     :return: a list representing the 4 number combination that was drawn
+
+    >>> combination = ball_combination_picker(realtime=False, verbose=False)
+    >>> len(set(combination)) == 4 and all(1 <= ball <= 14 for ball in combination)
+    True
     """
+    if not realtime:
+        ball_combination = random.sample(range(1, 15), 4)
+        if verbose:
+            for chosen_ball in ball_combination:
+                print("The chosen ball is: ", chosen_ball)
+        return ball_combination
+
     ping_pong_balls = list(range(1, 15))
     number_of_balls_picked = 0
     ball_combination = []
@@ -199,24 +476,29 @@ def ball_combination_picker():
         while elapsed < mixing_seconds:
             random.shuffle(ping_pong_balls)
             elapsed = time.time() - start
-            print("Shuffling ping pong balls; ", elapsed, "seconds elapsed...")
+            if verbose:
+                print("Shuffling ping pong balls; ", elapsed, "seconds elapsed...")
             time.sleep(.0001)
         chosen_ball = random.choice(ping_pong_balls)
-        print("The chosen ball is: ", chosen_ball)
+        if verbose:
+            print("The chosen ball is: ", chosen_ball)
         ball_combination.append(chosen_ball)
         ping_pong_balls.remove(chosen_ball)
 
     return ball_combination
 
 
-def team_selector(four_ball_combination, displaced_combination, teams_combinations):
+@_timed('team_selector')
+def team_selector(four_ball_combination, displaced_combination, teams_combinations, combination_lookup=None):
     """
     Once the combination of balls is drawn, we must check which team has actually been assigned this combination.
-    In order to do this, we look at all the permuatations of the ball combination and compare it to the combination
-    assigned to each team and the unassigned combination to see which one the combination belongs to.
+    In order to do this, we rank the sorted ball combination (see combination_rank()) and read the team that owns
+    that rank from the compact index made by odds_assigner(). If no index is given, it is built from the
+    teams_combinations dictionary.
     :param four_ball_combination: an array representing the four number combination that was chosen
     :param displaced_combination: an array representing the combination that has not been assigned to a team
     :param teams_combinations: a dictionary that maps each team to a set of combinations they've been assigned to
+    :param combination_lookup: the int8 array from odds_assigner() that maps each combination rank to a team index
     :return: the team that has been assigned the combination
 
     >>> team = team_selector([1,2,3,4], [11,12,13,14], {'Houston Rockets': [(1,2,3,4)]})
@@ -230,19 +512,25 @@ def team_selector(four_ball_combination, displaced_combination, teams_combinatio
     >>> team = team_selector([1,2,5,4], [11,12,13,14], {'Minnesota Timberwolves': [(1,2,4,3)]})
     >>> team != 'Minnesota Timberwolves'
     True
+
+    >>> team = team_selector([14,12,13,11], [11,12,13,14], {'Minnesota Timberwolves': [(1,2,4,3)]})
+    >>> team == ValueError
+    True
     """
-    ball_combinations = list(permutations(four_ball_combination, 4))
-    unassigned_four_ball_combinations = list(permutations(displaced_combination, 4))
-    for i in ball_combinations:
-        if i in unassigned_four_ball_combinations:
-            return ValueError
+    if combination_lookup is None:
+        combination_lookup = _combination_lookup(teams_combinations)
+    rank = combination_rank(four_ball_combination)
+    if rank == combination_rank(displaced_combination):
+        return ValueError
 
-        for j in teams_combinations:
-            if i in teams_combinations[j]:
-                return j
+    team_index = combination_lookup[rank]
+    if team_index >= 0:
+        return list(teams_combinations)[team_index]
 
 
-def lottery_results(dictionary_combinations, combination_unassigned, input_user):
+@_timed('lottery')
+def lottery_results(dictionary_combinations, combination_unassigned, input_user, combination_lookup=None,
+                    realtime=True, verbose=True):
     """
     This function calls on the ball_combination_picker() and team_selector() methods to run a full simulation of
     one NBA Draft Lottery. For the regular simulation, based on the first four teams that are assigned picks,
@@ -252,8 +540,13 @@ def lottery_results(dictionary_combinations, combination_unassigned, input_user)
     :param dictionary_combinations: dictionary that maps each team to their assigned ball combinations
     :param combination_unassigned: an array representing the unassigned ball combination
     :param input_user: a user inputted string expressing what type of simulation this is
+    :param combination_lookup: the int8 array from odds_assigner() that maps each combination rank to a team index
+    :param realtime: passed to ball_combination_picker(), False skips the timed mixing of the balls
+    :param verbose: whether the draws and the resulting picks are printed
     :return: a dictionary that maps each team to the pick that they've been given in the lottery
     """
+    if combination_lookup is None:
+        combination_lookup = _combination_lookup(dictionary_combinations)
     team_aggregate_stats = {}
     team_order = 1
     lottery_order = list(dictionary_combinations.keys())
@@ -267,17 +560,22 @@ def lottery_results(dictionary_combinations, combination_unassigned, input_user)
         pick_limit = 14
 
     while team_order <= pick_limit:
-        ball_combination = ball_combination_picker()
-        team = team_selector(ball_combination, combination_unassigned, dictionary_combinations)
-        print()
+        ball_combination = ball_combination_picker(realtime, verbose)
+        team = team_selector(ball_combination, combination_unassigned, dictionary_combinations, combination_lookup)
+        _count(draws=1, rejected_unassigned=team not in dictionary_combinations,
+               rejected_repeat=team in dictionary_combinations and team not in lottery_order)
+        if verbose:
+            print()
 
         if team in lottery_order:
-            print("The number #", team_order, " pick in the 2021 NBA Draft goes to: ", team)
+            if verbose:
+                print("The number #", team_order, " pick in the 2021 NBA Draft goes to: ", team)
             if team not in team_aggregate_stats:
                 team_aggregate_stats[team] = [team_order]
             else:
                 team_aggregate_stats[team].append(team_order)
-            print()
+            if verbose:
+                print()
             lottery_order.remove(team)
             team_order += 1
 
@@ -288,12 +586,13 @@ def lottery_results(dictionary_combinations, combination_unassigned, input_user)
         elif input_user == 'w' or input_user == 'W':
             total_pick_limit = 15
 
-        print()
-        print("Picks 5 -", total_pick_limit, "are in this order: ")
+        if verbose:
+            print()
+            print("Picks 5 -", total_pick_limit, "are in this order: ")
         for j in lottery_order:
-            if pick_number != total_pick_limit:
+            if verbose and pick_number != total_pick_limit:
                 print(j + ", ")
-            else:
+            elif verbose:
                 print(j)
 
             if j not in team_aggregate_stats:
@@ -302,16 +601,976 @@ def lottery_results(dictionary_combinations, combination_unassigned, input_user)
                 team_aggregate_stats[j].append(pick_number)
             pick_number += 1
 
-    print('___________________')
+    if verbose:
+        print('___________________')
+    _count(lotteries=1)
     return team_aggregate_stats
 
 
-def team_stats_calculator(team_stats):
+def wild_card_draw(seed=None, league=None):
+    """
+    Picks the wild-card playoff team and draws its odds from a normal distribution with mean 0.07 and standard
+    deviation 0.035, redrawn until they are positive and below the best odds in the league. Nothing is printed, and
+    the draw comes from a numpy Generator, so it can be seeded and done once for a whole batch of lotteries.
+    :param seed: a seed, SeedSequence or numpy random Generator to draw with
+    :param league: the LeagueDefinition the wild-card team joins, the 2021 lottery if not given
+    :return: the wild-card playoff team and its odds of obtaining the #1 pick
+
+    >>> playoff_team, wild_card_odds = wild_card_draw(seed=4)
+    >>> playoff_team in WILD_CARD_PLAYOFF_TEAMS and 0 < wild_card_odds < 0.14
+    True
+    """
+    rng = np.random.default_rng(seed)
+    top_odds = max((LEAGUE_2021 if league is None else league).team_odds)
+    mu, sigma = 0.07, 0.035
+    wild_card_odds = np.round(rng.normal(mu, sigma), 3)
+    while wild_card_odds <= 0 or wild_card_odds >= top_odds:
+        wild_card_odds = np.round(rng.normal(mu, sigma), 3)
+    playoff_team = WILD_CARD_PLAYOFF_TEAMS[rng.integers(len(WILD_CARD_PLAYOFF_TEAMS))]
+    return playoff_team, float(wild_card_odds)
+
+
+def _wild_card_donors(team_odds, wild_card_odds):
+    """
+    The teams that can give up odds to the wild-card team: the bottom five teams in the standings whose own odds
+    are at least the wild-card team's, so that no team is left with negative odds.
+    :param team_odds: a list of each lottery team's odds of obtaining the #1 pick, in order of the standings
+    :param wild_card_odds: the odds of the wild-card team
+    :return: a list of the indices of the teams that can give up odds
+
+    >>> _wild_card_donors([0.14, 0.14, 0.14, 0.125, 0.105, 0.09], 0.12)
+    [0, 1, 2, 3]
+    """
+    return [donor for donor in range(min(5, len(team_odds))) if team_odds[donor] >= wild_card_odds]
+
+
+def _combination_teams(team_odds, excluded_combinations=((11, 12, 13, 14),)):
+    """
+    Array version of odds_assigner(). Each team is handed the next int(odds * assignable) of the assignable
+    combinations, in order of their rank. Since every combination is equally likely to be drawn, which combinations
+    a team gets doesn't change the lottery, so unlike odds_assigner() there is no shuffle and the result can be
+    cached. The excluded combinations and any combination left over by the truncation map to -1, so drawing them is
+    rejected.
+    :param team_odds: a list of each team's odds of obtaining the #1 pick
+    :param excluded_combinations: the four ball combinations that aren't assigned to any team
+    :return: an int8 array that maps each combination rank (see combination_rank()) to a team index
+    """
+    excluded_ranks = combination_rank(np.array(excluded_combinations, dtype=np.int64).reshape(-1, 4))
+    assignable = np.delete(np.arange(1001), excluded_ranks)
+    combination_teams = np.full(1001, -1, dtype=np.int8)
+    start = 0
+    for i, odds in enumerate(team_odds):
+        sample = _combination_count(odds, len(assignable))
+        combination_teams[assignable[start:start + sample]] = i
+        start += sample
+    return combination_teams
+
+
+def lottery_config(simulation_type, team_odds=None, wild_card=None, league=None):
+    """
+    This function prepares everything about a lottery that stays the same from one iteration to the next: the
+    team names, their odds, the ball combinations and the index that maps each combination to a team. It is built
+    once and memoized by (simulation type, odds, wild card, league), with a small least-recently-used cache so that
+    sweeps over many odds configurations don't rebuild the same one twice. For the 'w' simulation there is one row
+    of the combination index for each of the bottom five teams that can give up odds to the wild-card team (see
+    _wild_card_donors()), so simulate_lotteries() only has to pick a row for each lottery.
+    :param simulation_type: a user inputted string expressing what type of simulation this is ('r', 'a' or 'w')
+    :param team_odds: a list of each team's odds of obtaining the #1 pick, the league's odds if not given
+    :param wild_card: the wild-card playoff team and its odds, needed for the 'w' simulation
+    :param league: the LeagueDefinition from load_league() to simulate, the 2021 lottery if not given
+    :return: a read-only LotteryConfig
+
+    >>> config = lottery_config('r')
+    >>> config is lottery_config('r')
+    True
+
+    >>> config.combination_lookup.shape, config.drawn_picks
+    ((1, 1001), 4)
+
+    >>> lottery_config('w', wild_card=('Miami Heat', 0.05)).combination_lookup.shape
+    (5, 1001)
+
+    >>> lottery_config('w', wild_card=('Miami Heat', 0.12)).combination_lookup.shape
+    (4, 1001)
+
+    >>> config = lottery_config('r', league=LEAGUE_1985)
+    >>> config.drawn_picks, config.combination_counts[0].tolist()
+    (5, [142, 142, 142, 142, 142, 142, 142])
+    """
+    if team_odds is not None:
+        team_odds = tuple(float(odds) for odds in team_odds)
+    if wild_card is not None:
+        wild_card = (wild_card[0], float(wild_card[1]))
+    return _lottery_config(simulation_type, team_odds, wild_card, LEAGUE_2021 if league is None else league)
+
+
+@lru_cache(maxsize=64)
+def _lottery_config(simulation_type, team_odds, wild_card, league):
+    """
+    Cached version of lottery_config(), keyed by the simulation type, the tuples of odds and wild card and the league.
+    :param simulation_type: a user inputted string expressing what type of simulation this is ('r', 'a' or 'w')
+    :param team_odds: a tuple of each team's odds of obtaining the #1 pick, or None for the league's odds
+    :param wild_card: a tuple of the wild-card playoff team and its odds, or None
+    :param league: the LeagueDefinition to simulate
+    :return: a read-only LotteryConfig
+    """
+    if simulation_type not in ('r', 'a', 'w'):
+        raise ValueError("lottery configurations only exist for the 'r', 'a' and 'w' simulations")
+    if simulation_type == 'w' and wild_card is None:
+        raise ValueError("the 'w' simulation needs a wild card team and its odds")
+
+    team_names = list(league.team_names)
+    short_names = list(league.short_names)
+    if team_odds is None:
+        team_odds = league.team_odds
+    if len(team_odds) != len(team_names):
+        raise ValueError('there must be one odds value for each team in the league')
+    odds_variants = [list(team_odds)]
+
+    if simulation_type == 'w':
+        playoff_team, wild_card_odds = wild_card
+        donors = _wild_card_donors(team_odds, wild_card_odds)
+        if not donors:
+            raise ValueError('none of the bottom five teams has enough odds to give to the wild card team')
+        team_names.append(playoff_team)
+        short_names.append(TEAM_SHORT_NAMES.get(playoff_team, playoff_team))
+        team_odds += (wild_card_odds,)
+        odds_variants = []
+        for donor in donors:
+            donor_odds = list(team_odds)
+            donor_odds[donor] -= wild_card_odds
+            odds_variants.append(donor_odds)
+
+    ping_pong_combinations = combinations_creator('r')[0]
+    combination_lookup = np.stack([_combination_teams(variant, league.excluded_combinations)
+                                   for variant in odds_variants])
+    combination_counts = np.stack([np.bincount(lookup[lookup >= 0], minlength=len(team_names))
+                                   for lookup in combination_lookup])
+    arrays = [np.array(team_odds), np.array(ping_pong_combinations, dtype=np.int8), combination_lookup,
+              combination_counts]
+    for array in arrays:
+        array.setflags(write=False)
+
+    # a lottery can't draw more teams than hold combinations, the rest follow the standings
+    drawn_picks = len(team_names) if simulation_type == 'a' else league.drawn_picks
+    drawn_picks = min(drawn_picks, int(np.count_nonzero(combination_counts, axis=1).min()))
+    return LotteryConfig(simulation_type, tuple(team_names), tuple(short_names), arrays[0], drawn_picks, arrays[1],
+                         league.excluded_combinations, arrays[2], arrays[3])
+
+
+def ceremony_combinations(config, row=0):
+    """
+    Turns one row of a LotteryConfig into the dictionary of each team's combinations and the index that
+    lottery_results() and team_selector() take, so the ceremony version of a lottery can be run again and again from
+    a config built once, instead of calling combinations_creator(), odds_creator() and odds_assigner() before every
+    lottery. Like odds_assigner(), teams without any combinations are left out of the dictionary.
+    :param config: a LotteryConfig from lottery_config()
+    :param row: the row of config.combination_lookup to use, in the 'w' simulation each row is a different team
+                giving up odds to the wild-card team (see _wild_card_donors())
+    :return: a read-only dictionary that maps each team to a tuple of their combinations, and a read-only int8 array
+             that maps each combination rank (see combination_rank()) to the index of its team in that dictionary
+
+    >>> config = lottery_config('r')
+    >>> team_combinations, combination_lookup = ceremony_combinations(config)
+    >>> len(team_combinations), sum(len(team_combinations[team]) for team in team_combinations)
+    (14, 1000)
+
+    >>> team_selector((4, 3, 2, 1), config.excluded_combinations[0], team_combinations, combination_lookup)
+    'Houston Rockets'
+    """
+    lookup = config.combination_lookup[row]
+    combinations_dictionary = {}
+    for team_index, team in enumerate(config.team_names):
+        ranks = np.flatnonzero(lookup == team_index)
+        if ranks.size > 0:
+            combinations_dictionary[team] = tuple(map(tuple, config.ping_pong_combinations[ranks].tolist()))
+    combination_lookup = _combination_lookup(combinations_dictionary)
+    combination_lookup.setflags(write=False)
+    return MappingProxyType(combinations_dictionary), combination_lookup
+
+
+@_timed('simulate')
+def simulate_lotteries(iterations, simulation_type, seed=None, wild_card=None, league=None):
+    """
+    Batch version of lottery_results() for the 'r', 'a' and 'w' simulations. Instead of drawing one ball at a time,
+    the four ball combination for every lottery that still needs a pick is drawn at once as a numpy array. Draws
+    of the discarded combination, or of a team that already has a pick, are rejected and redrawn, just like on
+    lottery night. The remaining picks are then filled in order of the teams' odds. In the 'w' simulation the team
+    that gives up odds to the wild-card team is drawn for every lottery at once as an array, and each lottery reads
+    its combinations from that team's precomputed row of lottery_config().combination_lookup, so it runs as fast as
+    the regular simulation. lottery_results() is still the "ceremony" version of a single lottery that prints every
+    ball.
+    :param iterations: the number of lotteries to simulate
+    :param simulation_type: a user inputted string expressing what type of simulation this is
+    :param seed: a seed (or numpy SeedSequence) for the numpy random Generator, so runs can be reproduced
+    :param wild_card: the wild-card playoff team and its odds for the 'w' simulation, drawn here if not given
+    :param league: the LeagueDefinition from load_league() to simulate, the 2021 lottery if not given
+    :return: an (iterations x teams) int8 array of the pick each team received in each lottery, and a list of the
+             team names for the columns of the array
+
+    >>> picks, teams = simulate_lotteries(1000, 'r', seed=1)
+    >>> picks.shape == (1000, 14) and picks.dtype == np.int8
+    True
+
+    >>> bool((np.sort(picks, axis=1) == np.arange(1, 15)).all())
+    True
+
+    >>> bool((picks[:, 0] <= 5).all())
+    True
+
+    >>> picks, teams = simulate_lotteries(100, 'w', seed=1)
+    >>> len(teams) == 15 and teams[14] in WILD_CARD_PLAYOFF_TEAMS
+    True
+
+    >>> picks, teams = simulate_lotteries(100, 'a', seed=1)
+    >>> bool((np.sort(picks, axis=1) == np.arange(1, 15)).all())
+    True
+
+    >>> picks, teams = simulate_lotteries(100, 'r', seed=1, league=LEAGUE_1985)
+    >>> picks.shape, bool((np.sort(picks, axis=1) == np.arange(1, 8)).all())
+    ((100, 7), True)
+
+    >>> league = LEAGUE_2021._replace(team_odds=(0.2,) * 5 + (0,) * 9)
+    >>> picks, teams = simulate_lotteries(100, 'a', seed=1, league=league)
+    >>> bool((np.sort(picks[:, :5], axis=0)[-1] <= 5).all()), picks[0, 5:].tolist()
+    (True, [6, 7, 8, 9, 10, 11, 12, 13, 14])
+    """
+    if simulation_type not in ('r', 'a', 'w'):
+        raise ValueError("simulate_lotteries() only supports the 'r', 'a' and 'w' simulations")
+
+    rng = np.random.default_rng(seed)
+    if simulation_type == 'w' and wild_card is None:
+        wild_card = wild_card_draw(rng, league)
+    config = lottery_config(simulation_type, wild_card=wild_card, league=league)
+    team_names = list(config.team_names)
+    combination_teams = config.combination_lookup
+    combination_counts = config.combination_counts.astype(np.int16)  # at most 1001, and a quarter of the memory
+    if len(combination_teams) > 1:
+        donors = rng.integers(0, len(combination_teams), iterations)  # the team that gives up odds in each lottery
+    else:
+        donors = np.zeros(iterations, dtype=np.intp)
+
+    team_count = len(team_names)
+    pick_limit = config.drawn_picks
+    picks = np.zeros((iterations, team_count), dtype=np.int8)
+    has_pick = np.zeros((iterations, team_count), dtype=bool)
+
+    with _stage('draw'):
+        for pick_number in range(1, pick_limit + 1):
+            pending = np.arange(iterations)
+            rejection_rounds = 0
+            while pending.size > 0 and rejection_rounds < 8:
+                # four balls drawn without replacement are one combination rank drawn uniformly
+                drawn = rng.integers(0, combination_teams.shape[1], pending.size)
+                team = combination_teams[donors[pending], drawn]
+                accepted = team >= 0
+                assigned = np.count_nonzero(accepted) if _instrumentation is not None else 0
+                accepted[accepted] = ~has_pick[pending[accepted], team[accepted]]
+                if _instrumentation is not None:
+                    _count(draws=pending.size, rejected_unassigned=pending.size - assigned,
+                           rejected_repeat=assigned - np.count_nonzero(accepted))
+                rows = pending[accepted]
+                picks[rows, team[accepted]] = pick_number
+                has_pick[rows, team[accepted]] = True
+                pending = pending[~accepted]
+                rejection_rounds += 1
+
+            # redrawing is memoryless, so a lottery that keeps drawing rejected combinations ends up with a
+            # combination drawn uniformly from the ones that are still valid. this draws that combination directly
+            # and stops the late picks of the 'a' simulation from costing hundreds of redraws each
+            if pending.size > 0:
+                _count(direct_draws=pending.size)
+                valid_counts = np.cumsum(combination_counts[donors[pending]] * ~has_pick[pending], axis=1,
+                                         dtype=np.int16)
+                drawn = rng.random(pending.size) * valid_counts[:, -1]
+                team = (valid_counts <= drawn[:, np.newaxis]).sum(axis=1)
+                picks[pending, team] = pick_number
+                has_pick[pending, team] = True
+
+    _fill_undrawn_picks(picks, has_pick, pick_limit)
+    _count(lotteries=iterations)
+    return picks, team_names
+
+
+def _fill_undrawn_picks(picks, has_pick, drawn_picks):
+    """
+    Gives the teams that weren't drawn the picks after the drawn ones, in the order the teams are listed in.
+    :param picks: an (iterations x teams) pick matrix, filled in place
+    :param has_pick: an (iterations x teams) boolean array of the teams that were drawn
+    :param drawn_picks: the number of picks that were drawn
+    """
+    undrawn = ~has_pick
+    picks[undrawn] = (drawn_picks + np.cumsum(undrawn, axis=1, dtype=np.int8))[undrawn]  # a league has <= 127 teams
+
+
+@_timed('aggregate')
+def pick_counts(picks):
+    """
+    Counts how many times each team received each pick in a pick matrix from simulate_lotteries().
+    :param picks: an (iterations x teams) array of the pick each team received in each lottery
+    :return: a (teams x picks) int64 array where entry [i, j] is the number of times team i got pick j + 1
+
+    >>> pick_counts(np.array([[1, 2, 3], [2, 1, 3]]))
+    array([[1, 1, 0],
+           [1, 1, 0],
+           [0, 0, 2]])
+    """
+    team_count = picks.shape[1]
+    # one column at a time, so the only temporary is one team's picks as integers instead of the whole matrix
+    return np.stack([np.bincount(picks[:, i], minlength=team_count + 1)[1:] for i in range(team_count)])
+
+
+def _lottery_chunks(iterations, simulation_type, seed, chunk_size, league=None, wild_card=None):
+    """
+    Splits a run into fixed size chunks, each with its own child of the run's numpy SeedSequence. For the 'w'
+    simulation the wild-card team and its odds are drawn once here, unless they are given, and shared by every chunk.
+    :param iterations: the number of lotteries to simulate
+    :param simulation_type: a user inputted string expressing what type of simulation this is
+    :param seed: a seed (or numpy SeedSequence) for the SeedSequence of the run
+    :param chunk_size: the number of lotteries simulated in each chunk
+    :param league: the LeagueDefinition to simulate, the 2021 lottery if not given
+    :param wild_card: the wild-card playoff team and its odds for the 'w' simulation
+    :return: a list of (number of lotteries, simulation type, SeedSequence, wild card, league) tuples, one per chunk
+    """
+    if iterations < 0:
+        raise ValueError("the number of iterations can't be negative")
+    if chunk_size < 1:
+        raise ValueError('the chunk size must be at least 1')
+    seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    wild_card_sequence, chunk_sequence = seed_sequence.spawn(2)
+    if simulation_type == 'w' and wild_card is None:
+        wild_card = wild_card_draw(wild_card_sequence, league)
+
+    chunk_sizes = [chunk_size] * (iterations // chunk_size)
+    if iterations % chunk_size or iterations == 0:  # an empty run is one empty chunk, so it still has team names
+        chunk_sizes.append(iterations % chunk_size)
+    return [(size, simulation_type, chunk_seed, wild_card, league)
+            for size, chunk_seed in zip(chunk_sizes, chunk_sequence.spawn(len(chunk_sizes)))]
+
+
+def _lottery_count_chunk(chunk):
+    """
+    Runs one chunk of parallel_lottery_counts() inside a worker process.
+    :param chunk: a tuple of the number of lotteries, the simulation type, the chunk's SeedSequence, the wild card
+                  and the league
+    :return: the (teams x picks) pick counts of the chunk and the list of team names
+    """
+    iterations, simulation_type, seed_sequence, wild_card, league = chunk
+    picks, team_names = _simulation_batch(iterations, simulation_type, seed_sequence, wild_card, league)
+    return pick_counts(picks), team_names
+
+
+def parallel_lottery_counts(iterations, simulation_type, seed=None, workers=None, chunk_size=100000, league=None):
+    """
+    Runs simulate_lotteries() for many iterations across a pool of worker processes. The iterations are split
+    into fixed size chunks and every chunk gets its own child of one numpy SeedSequence, so the chunks are
+    independent streams. Because the chunks and their seeds don't depend on the number of workers, the same seed
+    gives the same totals no matter how many workers run. For the 'w' simulation the wild-card team and its odds
+    are drawn once for the whole run. The 'o' simulation also runs here, through simulate_rigged_lotteries().
+    :param iterations: the number of lotteries to simulate
+    :param simulation_type: a user inputted string expressing what type of simulation this is
+    :param seed: a seed for the SeedSequence of the run
+    :param workers: the number of worker processes, defaults to the number of CPUs, 1 runs in this process
+    :param chunk_size: the number of lotteries simulated in each chunk
+    :param league: the LeagueDefinition from load_league() to simulate, the 2021 lottery if not given
+    :return: a (teams x picks) int64 array of how many times each team got each pick, and the list of team names
+
+    >>> counts, teams = parallel_lottery_counts(2500, 'r', seed=7, workers=1, chunk_size=1000)
+    >>> int(counts.sum(axis=1)[0]) == 2500
+    True
+
+    >>> pooled_counts, teams = parallel_lottery_counts(2500, 'r', seed=7, workers=2, chunk_size=1000)
+    >>> bool((pooled_counts == counts).all())
+    True
+
+    >>> counts, teams = parallel_lottery_counts(0, 'r', workers=1)
+    >>> counts.shape, int(counts.sum())
+    ((14, 14), 0)
+    """
+    chunks = _lottery_chunks(iterations, simulation_type, seed, chunk_size, league)
+    results = list(_map_lottery_chunks(chunks, workers))
+    counts = sum(chunk_counts for chunk_counts, team_names in results)
+    team_names = results[0][1]
+    return counts, team_names
+
+
+def _map_lottery_chunks(chunks, workers):
+    """
+    Runs _lottery_count_chunk() over a list of chunks, in this process or across a pool of worker processes, and
+    yields the results in the order of the chunks as they finish.
+    :param chunks: a list of chunks from _lottery_chunks()
+    :param workers: the number of worker processes, defaults to the number of CPUs, 1 runs in this process
+    :return: a generator of the (teams x picks) pick counts and team names of each chunk
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1:
+        yield from map(_lottery_count_chunk, chunks)
+    else:
+        from concurrent.futures import ProcessPoolExecutor  # pulls in multiprocessing, so only when it's needed
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            yield from pool.map(_lottery_count_chunk, chunks)
+
+
+def sweep_grid(**options):
+    """
+    Builds the list of variants for sweep_lotteries() out of every combination of the given options.
+    :param options: each variant setting of sweep_lotteries() mapped to a list of the values to try
+    :return: a list of variant dictionaries
+
+    >>> sweep_grid(drawn_picks=[3, 4], wild_card=[None, ('Miami Heat', 0.05)])[1]
+    {'drawn_picks': 3, 'wild_card': ('Miami Heat', 0.05)}
+    """
+    return [dict(zip(options, values)) for values in product(*options.values())]
+
+
+def _sweep_variant(variant):
+    """
+    Turns one variant of a sweep into the simulation type, league and wild card that simulate_lotteries() runs.
+    :param variant: a dictionary with any of the keys 'simulation_type', 'league', 'team_odds', 'drawn_picks' and
+                    'wild_card'
+    :return: the simulation type, the LeagueDefinition and the wild card (or None)
+    """
+    league = variant.get('league') or LEAGUE_2021
+    if variant.get('team_odds') is not None:
+        league = league._replace(team_odds=tuple(float(odds) for odds in variant['team_odds']))
+    if variant.get('drawn_picks') is not None:
+        league = league._replace(drawn_picks=int(variant['drawn_picks']))
+    wild_card = variant.get('wild_card')
+    if wild_card is not None:
+        wild_card = (wild_card[0], float(wild_card[1]))
+    simulation_type = variant.get('simulation_type', 'w' if wild_card is not None else 'r')
+    if simulation_type not in ('r', 'a', 'w'):
+        raise ValueError("sweep_lotteries() only supports the 'r', 'a' and 'w' simulations")
+    return simulation_type, league, wild_card
+
+
+def sweep_lotteries(variants, iterations, seed=None, workers=None, chunk_size=100000, cache_dir=None):
+    """
+    Runs a simulation for every variant of a lottery reform study, such as flatter odds, more drawn picks or
+    different wild-card odds. The chunks of all the variants go through one pool of worker processes. Every variant
+    is run with the same seed, so they share common random numbers: the same ball draws are handed to each
+    variant, and the differences between their results come from the rules rather than from luck. If a cache
+    directory is given, each variant's counts are saved there as soon as it finishes, under a hash of its settings,
+    the number of iterations and the seed, so re-running a sweep that was stopped part of the way only simulates the
+    variants that are missing.
+    :param variants: a list of dictionaries (see sweep_grid()) with any of the keys 'simulation_type' ('r', 'a' or
+                     'w', which is the default when a wild card is given and 'r' otherwise), 'league' (a
+                     LeagueDefinition, the 2021 lottery if not given), 'team_odds', 'drawn_picks' and 'wild_card'
+    :param iterations: the number of lotteries to simulate for each variant
+    :param seed: a seed for the SeedSequence shared by every variant, a random one if not given
+    :param workers: the number of worker processes, defaults to the number of CPUs, 1 runs in this process
+    :param chunk_size: the number of lotteries simulated in each chunk
+    :param cache_dir: a directory to keep the results of each variant in
+    :return: a list with the (teams x picks) count matrix and the list of team names of each variant
+
+    >>> import tempfile
+    >>> with tempfile.TemporaryDirectory() as cache_dir:
+    ...     results = sweep_lotteries(sweep_grid(drawn_picks=[3, 4]), 2000, seed=5, workers=1, cache_dir=cache_dir)
+    ...     cached = sweep_lotteries([{'drawn_picks': 4}], 2000, seed=5, workers=1, cache_dir=cache_dir)
+    ...     len(os.listdir(cache_dir))
+    2
+    >>> bool((cached[0][0] == results[1][0]).all())
+    True
+    >>> bool((results[0][0][:, :3] == results[1][0][:, :3]).all())  # the first three picks use the same draws
+    True
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    results = [None] * len(variants)
+    cache_paths = {}
+    chunks = []
+    chunk_variants = []
+    for position, variant in enumerate(variants):
+        simulation_type, league, wild_card = _sweep_variant(variant)
+        if cache_dir is not None:
+            settings = json.dumps([simulation_type, league, wild_card, iterations, seed, chunk_size])
+            cache_paths[position] = os.path.join(cache_dir, hashlib.sha256(settings.encode()).hexdigest()[:24])
+            if os.path.exists(cache_paths[position] + '.npz'):
+                with np.load(cache_paths[position] + '.npz') as cached:
+                    results[position] = (cached['counts'], cached['team_names'].tolist())
+                continue
+        variant_chunks = _lottery_chunks(iterations, simulation_type, seed, chunk_size, league, wild_card)
+        chunks += variant_chunks
+        chunk_variants += [position] * len(variant_chunks)
+
+    chunks_left = Counter(chunk_variants)
+    for position, (chunk_counts, team_names) in zip(chunk_variants, _map_lottery_chunks(chunks, workers)):
+        counts = chunk_counts if results[position] is None else results[position][0] + chunk_counts
+        results[position] = (counts, team_names)
+        chunks_left[position] -= 1
+        if chunks_left[position] == 0 and position in cache_paths:
+            temporary_path = cache_paths[position] + '.partial.npz'
+            np.savez(temporary_path, counts=counts, team_names=np.array(team_names))
+            os.replace(temporary_path, cache_paths[position] + '.npz')
+    return results
+
+
+def rare_event_probability(event, iterations=100000, simulation_type='r', proposal_odds=None, seed=None,
+                           league=None):
+    """
+    Estimates the chance of a rare lottery outcome, like the Spurs jumping to #1 and the Warriors to #2, with
+    importance sampling. The drawn picks are simulated with proposal_odds instead of the real combination counts,
+    which draws the low-odds teams far more often, and every lottery is then weighted by its likelihood ratio: the
+    chance of its draw order under the real odds divided by its chance under the proposal odds. The average of the
+    weights of the lotteries where the event happened is an unbiased estimate of its real probability.
+    :param event: a function that takes an (iterations x teams) pick matrix, with the teams in the order of
+                  lottery_config(simulation_type).team_names, and returns a boolean array of the lotteries where
+                  the event happened
+    :param iterations: the number of lotteries to simulate
+    :param simulation_type: a user inputted string expressing what type of simulation this is ('r' or 'a')
+    :param proposal_odds: the odds to draw each team with, every team that holds combinations equally likely if
+                          not given
+    :param seed: a seed for the numpy random Generator
+    :param league: the LeagueDefinition from load_league() to simulate, the 2021 lottery if not given
+    :return: the estimated probability of the event and the standard error of the estimate
+
+    >>> teams = lottery_config('r').team_names
+    >>> spurs, warriors = teams.index('San Antonio Spurs'), teams.index('Golden State Warriors')
+    >>> probability, error = rare_event_probability(lambda picks: (picks[:, spurs] == 1) & (picks[:, warriors] == 2),
+    ...                                             seed=2)
+    >>> exact = 5 / 1000 * 10 / 995
+    >>> bool(abs(probability - exact) < 4 * error) and bool(error < exact / 10)
+    True
+
+    >>> league = LEAGUE_2021._replace(team_odds=(0.25,) * 4 + (0,) * 10)
+    >>> probability, error = rare_event_probability(lambda picks: picks[:, 0] == 1, seed=2, league=league)
+    >>> bool(abs(probability - 0.25) < 4 * error) and bool(error < 0.01)
+    True
+    """
+    if simulation_type not in ('r', 'a'):
+        raise ValueError("rare_event_probability() only supports the 'r' and 'a' simulations")
+    config = lottery_config(simulation_type, league=league)
+    weights = config.combination_counts[0].astype(float)
+    proposal = (weights > 0).astype(float) if proposal_odds is None else np.asarray(proposal_odds, dtype=float)
+    if ((proposal <= 0) & (weights > 0)).any():
+        raise ValueError('the proposal odds must be positive for every team that can be drawn')
+
+    rng = np.random.default_rng(seed)
+    rows = np.arange(iterations)
+    picks = np.zeros((iterations, len(weights)), dtype=np.int8)
+    has_pick = np.zeros((iterations, len(weights)), dtype=bool)
+    log_ratio = np.zeros(iterations)
+    for pick_number in range(1, config.drawn_picks + 1):
+        left_weights = (weights * ~has_pick).sum(axis=1)
+        left_proposal = np.cumsum(proposal * ~has_pick, axis=1)
+        drawn = rng.random(iterations) * left_proposal[:, -1]
+        team = (left_proposal <= drawn[:, np.newaxis]).sum(axis=1)
+        log_ratio += (np.log(weights[team] / left_weights)
+                      - np.log(proposal[team] / left_proposal[:, -1]))
+        picks[rows, team] = pick_number
+        has_pick[rows, team] = True
+    _fill_undrawn_picks(picks, has_pick, config.drawn_picks)
+
+    weighted_events = np.exp(log_ratio) * event(picks)
+    return float(weighted_events.mean()), float(weighted_events.std(ddof=1) / np.sqrt(iterations))
+
+
+@_timed('simulate')
+def simulate_rigged_lotteries(iterations, seed=None):
+    """
+    Batch version of the 'o' simulation, which runs bernoulli_random_trial(), nba_rigging_odds() and
+    nba_1985_draft_lottery_simulator() for every lottery at once. Whether the rigging is caught, the Knicks' odds
+    (drawn from the same truncated normal distribution, with the draws that fall outside it redrawn as an array) and
+    the team that makes up the difference are all drawn as arrays. The drawn picks of LEAGUE_1985 are then drawn in
+    order without replacement, with each team's chance proportional to its odds, using the Gumbel-top-k trick: adding
+    independent Gumbel noise to the log of each team's odds and sorting gives the same order as drawing the teams
+    one at a time. The other picks go to the teams that are left in order, like in nba_1985_draft_lottery_simulator().
+    :param iterations: the number of lotteries to simulate
+    :param seed: a seed (or numpy SeedSequence) for the numpy random Generator, so runs can be reproduced
+    :return: an (iterations x teams) int8 array of the pick each team received in each lottery, and a list of the
+             team names for the columns of the array
+
+    >>> picks, teams = simulate_rigged_lotteries(1000, seed=1)
+    >>> picks.shape, teams[0]
+    ((1000, 7), 'New York Knicks')
+
+    >>> bool((np.sort(picks, axis=1) == np.arange(1, 8)).all())
+    True
+
+    >>> bool((simulate_rigged_lotteries(1000, seed=1)[0] == picks).all())
+    True
+    """
+    rng = np.random.default_rng(seed)
+    rows = np.arange(iterations)
+    fair_odds = LEAGUE_1985.team_odds[0]
+    team_odds = np.tile(np.array(LEAGUE_1985.team_odds), (iterations, 1))
+
+    rigged = rng.random(iterations) < 0.7  # the same 0.7 success rate as bernoulli_random_trial()
+    knicks_odds = np.full(iterations, 0.01)
+    pending = np.flatnonzero(rigged)
+    while pending.size > 0:
+        drawn = np.round(rng.normal(0.25, 0.1, pending.size), 3)
+        accepted = (drawn > fair_odds) & (drawn < 2 * fair_odds)
+        knicks_odds[pending[accepted]] = drawn[accepted]
+        pending = pending[~accepted]
+
+    # the Knicks' gain (or loss, when the rigging is caught) comes out of (or goes to) one of the other six teams
+    donors = rng.integers(1, team_odds.shape[1], iterations)
+    team_odds[rows, donors] -= knicks_odds - fair_odds
+    team_odds[:, 0] = knicks_odds
+    return _gumbel_top_k_picks(team_odds, LEAGUE_1985.drawn_picks, rng), list(LEAGUE_1985.team_names)
+
+
+_GUMBEL_BLOCK_SIZE = 65536  # the number of lotteries _gumbel_top_k_picks() makes keys for at a time
+
+
+def _gumbel_top_k_picks(team_odds, drawn_picks, rng):
+    """
+    Draws the first drawn_picks picks of every lottery in order without replacement, with each team's chance of
+    the next pick proportional to its odds among the teams that are left, using the Gumbel-top-k trick: adding
+    independent Gumbel noise to the log of each team's odds and sorting gives the same order as drawing the teams one
+    at a time. The teams that aren't drawn get the remaining picks in the order they are listed in.
+    :param team_odds: an (iterations x teams) array of each team's odds in each lottery, with at least drawn_picks
+                      positive odds in every row
+    :param drawn_picks: the number of picks that are drawn
+    :param rng: a numpy random Generator
+    :return: an (iterations x teams) int8 array of the pick each team received in each lottery
+    """
+    iterations = team_odds.shape[0]
+    picks = np.zeros(team_odds.shape, dtype=np.int8)
+    has_pick = np.zeros(team_odds.shape, dtype=bool)
+    with _stage('draw'):
+        # the float64 keys and their sort indexes are 16 bytes per team per lottery, so they are made a block of
+        # lotteries at a time. the Gumbel noise comes off the generator in the same order either way
+        for start in range(0, iterations, _GUMBEL_BLOCK_SIZE):
+            block = slice(start, start + _GUMBEL_BLOCK_SIZE)
+            keys = rng.gumbel(size=team_odds[block].shape)
+            with np.errstate(divide='ignore'):  # teams with no odds get a key of -inf and are never drawn
+                keys += np.log(team_odds[block])
+            np.negative(keys, out=keys)  # so that sorting in ascending order puts the largest key first
+            top = np.argpartition(keys, drawn_picks - 1, axis=1)[:, :drawn_picks]
+            order = np.take_along_axis(top, np.argsort(np.take_along_axis(keys, top, axis=1), axis=1), axis=1)
+            block_rows = np.arange(len(order))[:, np.newaxis]
+            picks[block][block_rows, order] = np.arange(1, drawn_picks + 1)
+            has_pick[block][block_rows, order] = True
+    _fill_undrawn_picks(picks, has_pick, drawn_picks)
+    _count(lotteries=iterations, draws=iterations * drawn_picks)
+    return picks
+
+
+@_timed('simulate')
+def simulate_multinomial_lotteries(iterations, seed=None, league=None):
+    """
+    Batch version of the 'm' simulation. Instead of sampling each team's picks from its own multinomial
+    distribution, which can hand the same pick to two teams, whole draft orders are sampled: the drawn picks go to
+    teams in order without replacement in proportion to their odds, and the rest follow the standings. Every pick
+    goes to exactly one team, and each team's chance of each pick is exactly its row of the odds_creator('m') table.
+    No ball combinations are needed, so the odds aren't rounded to whole combinations either.
+    :param iterations: the number of drafts to simulate
+    :param seed: a seed (or numpy SeedSequence) for the numpy random Generator, so runs can be reproduced
+    :param league: the LeagueDefinition from load_league() to simulate, the 2021 lottery if not given
+    :return: an (iterations x teams) int8 array of the pick each team received in each draft, and a list of the
+             team names for the columns of the array
+
+    >>> picks, teams = simulate_multinomial_lotteries(1000, seed=1)
+    >>> picks.shape, bool((np.sort(picks, axis=1) == np.arange(1, 15)).all())
+    ((1000, 14), True)
+    """
+    league = LEAGUE_2021 if league is None else league
+    team_odds = np.array(league.team_odds)
+    drawn_picks = min(league.drawn_picks, int(np.count_nonzero(team_odds > 0)))
+    picks = _gumbel_top_k_picks(np.broadcast_to(team_odds, (iterations, len(team_odds))), drawn_picks,
+                                np.random.default_rng(seed))
+    return picks, list(league.team_names)
+
+
+def _simulation_batch(iterations, simulation_type, seed, wild_card=None, league=None):
+    """
+    Simulates one batch of lotteries for any of the 'r', 'a', 'w', 'm' and 'o' simulations.
+    :param iterations: the number of lotteries to simulate
+    :param simulation_type: a user inputted string expressing what type of simulation this is
+    :param seed: a seed (or numpy SeedSequence) for the batch
+    :param wild_card: the wild-card playoff team and its odds for the 'w' simulation
+    :param league: the LeagueDefinition to simulate, the 2021 lottery if not given (the 'o' simulation is always 1985)
+    :return: an (iterations x teams) int8 array of the pick each team received, and the list of team names
+    """
+    if simulation_type == 'o':
+        return simulate_rigged_lotteries(iterations, seed)
+    if simulation_type == 'm':
+        return simulate_multinomial_lotteries(iterations, seed, league)
+    return simulate_lotteries(iterations, simulation_type, seed, wild_card, league)
+
+
+def adaptive_lottery_counts(simulation_type, target_error=0.001, confidence=None, batch_size=100000,
+                            max_iterations=100000000, seed=None, league=None):
+    """
+    Instead of guessing a number of iterations up front, this function keeps simulating batches of lotteries until
+    every team's estimated chance of every pick is precise enough. After each batch the standard error of each
+    estimate is worked out as sqrt(p * (1 - p) / n), using p = (count + 1) / (n + 2) so that picks that haven't
+    come up yet still count as uncertain. If a confidence level is given, the error is the half-width of that
+    normal confidence interval instead. The run stops once the largest error is at most target_error, or after
+    max_iterations lotteries.
+    :param simulation_type: a user inputted string expressing what type of simulation this is ('r', 'a', 'w', 'm' or
+                            'o')
+    :param target_error: the largest standard error (or confidence interval half-width) allowed for any estimate
+    :param confidence: a confidence level such as 0.95 to use confidence interval half-widths as the error
+    :param batch_size: the number of lotteries simulated between checks
+    :param max_iterations: the most lotteries to simulate before giving up on the target
+    :param seed: a seed for the SeedSequence of the run
+    :param league: the LeagueDefinition from load_league() to simulate, the 2021 lottery if not given
+    :return: the (teams x picks) count matrix, the list of team names, the number of lotteries it took, and a
+             (teams x picks) array of the error of each team's estimated chance of each pick
+
+    >>> counts, teams, iterations, errors = adaptive_lottery_counts('r', target_error=0.01, batch_size=500, seed=3)
+    >>> bool(errors.max() <= 0.01) and int(counts[0].sum()) == iterations
+    True
+    """
+    if batch_size < 1 or max_iterations < 1:
+        raise ValueError('the batch size and the most iterations must both be at least 1')
+    z = NormalDist().inv_cdf((1 + confidence) / 2) if confidence is not None else 1
+    seed_sequence = np.random.SeedSequence(seed)
+    wild_card = None
+    if simulation_type == 'w':
+        wild_card = wild_card_draw(seed_sequence.spawn(1)[0], league)
+
+    counts = None
+    iterations = 0
+    while iterations < max_iterations:
+        batch_iterations = min(batch_size, max_iterations - iterations)
+        picks, team_names = _simulation_batch(batch_iterations, simulation_type, seed_sequence.spawn(1)[0],
+                                              wild_card, league)
+        batch_counts = pick_counts(picks)
+        counts = batch_counts if counts is None else counts + batch_counts
+        iterations += batch_iterations
+
+        probabilities = (counts + 1) / (iterations + 2)
+        errors = z * np.sqrt(probabilities * (1 - probabilities) / iterations)
+        if errors.max() <= target_error:
+            break
+
+    return counts, team_names, iterations, errors
+
+
+def draw_order(picks):
+    """
+    Turns a pick matrix from simulate_lotteries() around, so that each row lists the teams in the order they picked.
+    :param picks: an (iterations x teams) array of the pick each team received in each lottery
+    :return: an (iterations x picks) int8 array where entry [i, j] is the index of the team that got pick j + 1
+
+    >>> draw_order(np.array([[2, 3, 1], [1, 2, 3]]))
+    array([[2, 0, 1],
+           [0, 1, 2]], dtype=int8)
+    """
+    order = np.empty(picks.shape, dtype=np.int8)
+    teams = np.broadcast_to(np.arange(picks.shape[1], dtype=np.int8), picks.shape)
+    np.put_along_axis(order, picks.astype(np.intp) - 1, teams, axis=1)
+    return order
+
+
+def _results_info_path(path):
+    """
+    The sidecar file that write_lottery_results() keeps next to the .npy file of draw orders.
+    :param path: the path of the .npy file
+    :return: the path of the .json file with the team names and settings of the run
+    """
+    return os.path.splitext(path)[0] + '.json'
+
+
+def write_lottery_results(path, iterations, simulation_type, seed=None, chunk_size=100000, league=None):
+    """
+    This function keeps the full draw order of every lottery for later audits, instead of only the pick counts.
+    A .npy file big enough for the whole run is preallocated as a memory map and the (iterations x picks) team
+    index matrix of each chunk is written straight into its slice, so the run never has to fit in memory. Every
+    simulation type is stored, since the chunks run through the same engines as parallel_lottery_counts(), with the
+    same seeds, so the stored lotteries add up to the same counts for the same seed. The team names and settings go
+    in a .json file next to it.
+    :param path: where to write the .npy file
+    :param iterations: the number of lotteries to simulate
+    :param simulation_type: a user inputted string expressing what type of simulation this is
+    :param seed: a seed for the SeedSequence of the run
+    :param chunk_size: the number of lotteries simulated and written at a time
+    :param league: the LeagueDefinition from load_league() to simulate, the 2021 lottery if not given
+    :return: the list of team names that the team indices in the file refer to
+
+    >>> import tempfile
+    >>> directory = tempfile.mkdtemp()
+    >>> write_lottery_results(os.path.join(directory, 'rigged.npy'), 100, 'o', seed=1)[0]
+    'New York Knicks'
+
+    >>> team_names = write_lottery_results(os.path.join(directory, 'empty.npy'), 0, 'r')
+    >>> read_lottery_results(os.path.join(directory, 'empty.npy'))[0].shape
+    (0, 14)
+    """
+    chunks = _lottery_chunks(iterations, simulation_type, seed, chunk_size, league)
+    results = None
+    start = 0
+    for chunk_iterations, chunk_type, seed_sequence, wild_card, chunk_league in chunks:
+        picks, team_names = _simulation_batch(chunk_iterations, chunk_type, seed_sequence, wild_card, chunk_league)
+        if results is None:
+            # the settings are written before the lotteries, so a file is never left without them
+            with open(_results_info_path(path), 'w') as info_file:
+                json.dump({'team_names': team_names, 'simulation_type': simulation_type, 'seed': _json_seed(seed),
+                           'iterations': iterations, 'season': (LEAGUE_2021 if league is None else league).season},
+                          info_file)
+            results = np.lib.format.open_memmap(path, mode='w+', dtype=np.int8, shape=(iterations, len(team_names)))
+        results[start:start + chunk_iterations] = draw_order(picks)
+        start += chunk_iterations
+    results.flush()
+    del results
+    return team_names
+
+
+def _json_seed(seed):
+    """
+    The entropy of a seed as plain Python integers, so it can be saved as JSON and passed back in as the seed.
+    :param seed: None, an integer (numpy integers included), a sequence of integers or a numpy SeedSequence
+    :return: None, an integer or a list of integers
+
+    >>> _json_seed(np.int64(7)), _json_seed(np.random.SeedSequence([1, 2]))
+    (7, [1, 2])
+    """
+    if seed is None:
+        return None
+    entropy = (seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)).entropy
+    return int(entropy) if np.ndim(entropy) == 0 else [int(value) for value in entropy]
+
+
+def read_lottery_results(path):
+    """
+    Opens a file written by write_lottery_results() as a read-only memory map, so nothing is loaded into memory
+    until it is used and analysis can run over far more lotteries than fit in RAM.
+    :param path: the path of the .npy file
+    :return: the (iterations x picks) memory mapped array of team indices, and the list of team names
+
+    >>> import tempfile
+    >>> path = os.path.join(tempfile.mkdtemp(), 'results.npy')
+    >>> team_names = write_lottery_results(path, 2500, 'r', seed=7, chunk_size=1000)
+    >>> order, team_names = read_lottery_results(path)
+    >>> order.shape, isinstance(order, np.memmap)
+    ((2500, 14), True)
+
+    >>> counts, teams = parallel_lottery_counts(2500, 'r', seed=7, workers=1, chunk_size=1000)
+    >>> bool((pick_counts(np.argsort(order, axis=1) + 1) == counts).all())
+    True
+    """
+    with open(_results_info_path(path)) as info_file:
+        team_names = json.load(info_file)['team_names']
+    return np.load(path, mmap_mode='r'), team_names
+
+
+def exact_pick_probabilities(team_odds, drawn_picks=4):
+    """
+    This function works out each team's exact chances of landing each pick, without simulating anything. Every
+    ordered draw of the first drawn_picks picks is enumerated: a team wins the next drawn pick with its odds divided
+    by the odds of the teams that are still left, since draws of a team that already has a pick are thrown out. The
+    teams that aren't drawn then pick in the order they are listed in. The chances of the rest of the draw only depend
+    on which teams have already been picked, so they are memoized on that set of teams. When every pick is drawn,
+    the faster draw_all_pick_probabilities() is used instead.
+    :param team_odds: a list of each team's odds of obtaining the #1 pick, from the worst team to the best team
+    :param drawn_picks: the number of picks that are decided by drawing ping pong balls
+    :return: a (teams x picks) array where entry [i, j] is the probability that team i gets pick j + 1
+
+    >>> odds, playoff_selected_team, playoff_odds = odds_creator('r', 1, None, None)
+    >>> probabilities = exact_pick_probabilities(list(odds.values()))
+    >>> np.round(probabilities[0, :5], 3).tolist()
+    [0.14, 0.134, 0.127, 0.12, 0.479]
+
+    >>> bool(np.allclose(probabilities.sum(axis=0), 1) and np.allclose(probabilities.sum(axis=1), 1))
+    True
+    """
+    if drawn_picks >= len(team_odds) and min(team_odds) > 0:
+        return draw_all_pick_probabilities(team_odds)[0]
+    return _exact_pick_probabilities(tuple(float(odds) for odds in team_odds), drawn_picks).copy()
+
+
+@lru_cache(maxsize=32)
+def _exact_pick_probabilities(team_odds, drawn_picks):
+    """
+    Cached version of exact_pick_probabilities(), keyed by the tuple of odds.
+    :param team_odds: a tuple of each team's odds of obtaining the #1 pick
+    :param drawn_picks: the number of picks that are decided by drawing ping pong balls
+    :return: a read-only (teams x picks) array of pick probabilities
+    """
+    weights = np.array(team_odds)
+    team_count = len(weights)
+
+    @lru_cache(maxsize=None)
+    def remaining_draws(picked):
+        # the (teams x picks) probabilities for the rest of the lottery, given the bitmask of teams already picked
+        pick = bin(picked).count('1')
+        left = [t for t in range(team_count) if not picked >> t & 1]
+        probabilities = np.zeros((team_count, team_count))
+        if pick >= drawn_picks or weights[left].sum() <= 0:
+            probabilities[left, np.arange(pick, pick + len(left))] = 1
+            return probabilities
+
+        left_odds = weights[left].sum()
+        for t in left:
+            chance = weights[t] / left_odds
+            if chance > 0:
+                probabilities[t, pick] += chance
+                probabilities += chance * remaining_draws(picked | 1 << t)
+        return probabilities
+
+    probabilities = remaining_draws(0)
+    probabilities.setflags(write=False)
+    return probabilities
+
+
+def draw_all_pick_probabilities(team_odds):
+    """
+    Exact solver for the 'a' simulation, where ping pong balls are drawn for every pick. Going through every order
+    of the draw would take teams! steps, so instead this runs a dynamic program over the 2^teams sets of teams that
+    have already been picked. Layer by layer, the chance of reaching each set is passed on to every set with one more
+    team, which takes teams x 2^teams numpy operations and handles around 20 teams in a few seconds.
+    :param team_odds: a list of each team's odds of obtaining the #1 pick, all of them positive
+    :return: a (teams x picks) array where entry [i, j] is the probability that team i gets pick j + 1, and an array
+             of each team's expected pick
+
+    >>> odds, playoff_selected_team, playoff_odds = odds_creator('a', 1, None, None)
+    >>> probabilities, expected_picks = draw_all_pick_probabilities(list(odds.values()))
+    >>> bool(np.allclose(probabilities, _exact_pick_probabilities(tuple(odds.values()), 14)))
+    True
+
+    >>> np.round(expected_picks[[0, 13]], 2).tolist()
+    [4.68, 12.59]
+    """
+    weights = np.asarray(team_odds, dtype=float)
+    if (weights <= 0).any():
+        raise ValueError('every team needs positive odds when balls are drawn for every pick')
+    team_count = len(weights)
+
+    team_sets = np.arange(1 << team_count)
+    taken_odds = np.zeros(len(team_sets))
+    teams_picked = np.zeros(len(team_sets), dtype=np.int8)
+    for t in range(team_count):
+        has_team = (team_sets >> t) & 1 == 1
+        taken_odds[has_team] += weights[t]
+        teams_picked += has_team
+    left_odds = weights.sum() - taken_odds
+
+    reach = np.zeros(len(team_sets))  # the chance that the first picks went to exactly this set of teams
+    reach[0] = 1
+    probabilities = np.zeros((team_count, team_count))
+    for pick in range(team_count):
+        layer = np.flatnonzero(teams_picked == pick)
+        layer_chance = reach[layer] / left_odds[layer]
+        for t in range(team_count):
+            without_team = (layer >> t) & 1 == 0
+            chance = layer_chance[without_team] * weights[t]
+            probabilities[t, pick] = chance.sum()
+            reach[layer[without_team] | 1 << t] += chance
+
+    expected_picks = probabilities @ np.arange(1, team_count + 1)
+    return probabilities, expected_picks
+
+
+@_timed('aggregate')
+def team_stats_calculator(team_stats, team_names=None, pick_count_matrix=None):
     """
     This function uses the Counter function to count the number of times each team got each pick all the iterations
-    of the simulation are complete.
+    of the simulation are complete. When team_names is given, the picks are instead added to a fixed size
+    (teams x picks) count matrix, so passing the matrix back in after every lottery streams the results into it
+    without keeping a list of every pick.
     :param team_stats: A dictionary that maps each team to every pick that they received during the simulation
-    :return: a Counter object that maps each team to the counts of each pick that they received during the simulation
+    :param team_names: the order of the teams in the rows of the count matrix
+    :param pick_count_matrix: a (teams x picks) count matrix to add the picks to, created if not given
+    :return: a Counter object that maps each team to the counts of each pick that they received during the simulation,
+             or the (teams x picks) count matrix if team_names is given
 
     >>> cleaned_team_stats = team_stats_calculator({'Houston Rockets': [1, 2, 4, 6, 7]})
     >>> cleaned_team_stats
@@ -324,167 +1583,127 @@ def team_stats_calculator(team_stats):
     >>> cleaned_team_stats = team_stats_calculator({'Houston Rockets': [1, 2, 4, 6, 7], 'Minnesota Timberwolves': [1, 3, 3, 3, 3]})
     >>> len(cleaned_team_stats) == 4
     False
+
+    >>> teams = ['Houston Rockets', 'Minnesota Timberwolves']
+    >>> counts = team_stats_calculator({'Houston Rockets': [2], 'Minnesota Timberwolves': [1]}, teams)
+    >>> counts = team_stats_calculator({'Minnesota Timberwolves': [2], 'Houston Rockets': [1]}, teams, counts)
+    >>> counts
+    array([[1, 1],
+           [1, 1]])
     """
-    formatted_team_stats = {}
-    for i in team_stats:
-        formatted_team_stats[i] = Counter(team_stats[i])
-    return formatted_team_stats
-
-
-def team_data_plotter(team_aggregate_data):
-    """
-    This function creates two lists, one that contains each team's names, and one that contains their associated
-    picks from the simulation...these are used to generate a plot that provides a visual understanding of the
-    simulation
-    :param team_aggregate_data: a dictionary that maps each team to the counts of the picks they received
-                                during the simulation
-    """
-    new_key = "Kings"
-    old_key = "Sacramento Kings"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Pistons"
-    old_key = "Detroit Pistons"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Cavs"
-    old_key = "Cleveland Cavaliers"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Rockets"
-    old_key = "Houston Rockets"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Wolves"
-    old_key = "Minnesota Timberwolves"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Magic"
-    old_key = "Orlando Magic"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Thunder"
-    old_key = "Oklahoma City Thunder"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Raptors"
-    old_key = "Toronto Raptors"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Bulls"
-    old_key = "Chicago Bulls"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Wizards"
-    old_key = "Washington Wizards"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Pelicans"
-    old_key = "New Orleans Pelicans"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Pacers"
-    old_key = "Indiana Pacers"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Warriors"
-    old_key = "Golden State Warriors"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    new_key = "Spurs"
-    old_key = "San Antonio Spurs"
-    if old_key in team_aggregate_data:
-        team_aggregate_data[new_key] = team_aggregate_data.pop(old_key)
-
-    team_list = []
-    pick_list = []
-    for i in team_aggregate_data:
-        for j in team_aggregate_data[i].items():
-            k = 0
-            while k < int(j[1]):
-                team_list.append(i)
-                pick_list.append(j[0])
-                k += 1
-
-    fig_dims = (20, 10)
-    fig, ax = plt.subplots(figsize=fig_dims)
-    x = team_list
-    y = pick_list
-    print('___________________')
-    print()
-    print("The following plot summarizes our simulations of the NBA Draft Lottery: ")
-    print()
-    sns.stripplot(x=x, y=y, alpha=0.5, s=10, linewidth=1.0, jitter=True)
-    plt.show()
+    if team_names is None:
+        formatted_team_stats = {}
+        for i in team_stats:
+            formatted_team_stats[i] = Counter(team_stats[i])
+        return formatted_team_stats
+
+    if pick_count_matrix is None:
+        pick_count_matrix = np.zeros((len(team_names), len(team_names)), dtype=np.int64)
+    for row, i in enumerate(team_names):
+        for pick in team_stats.get(i, []):
+            pick_count_matrix[row, pick - 1] += 1
+    return pick_count_matrix
 
 
-def team_sim_data(team_info, sim_count, input_from_user):
+def _pick_count_matrix(team_info):
     """
-    This function takes our Counter dictionary and uses its values to obtain some summary statistics
-    for each team from our simulation. These statistics include: mean pick, standard deviation of pick,
-    highest pick and lowest pick. This function also tests our hypotheses laid out in the readme as well.
+    Turns the dictionary of Counters made by team_stats_calculator() into a (teams x picks) count matrix.
     :param team_info: a dictionary that maps each team to the counts of the number of times they obtained each pick
+    :return: the (teams x picks) count matrix and the list of team names for its rows
+    """
+    team_names = list(team_info)
+    pick_total = max([len(team_names)] + [max(team_info[i]) for i in team_names if team_info[i]])
+    pick_count_matrix = np.zeros((len(team_names), pick_total), dtype=np.int64)
+    for row, i in enumerate(team_names):
+        for pick, count in team_info[i].items():
+            pick_count_matrix[row, pick - 1] = count
+    return pick_count_matrix, team_names
+
+
+def team_data_plotter(team_aggregate_data, team_names=None, plot_type='strip', max_points=None, output_path=None):
+    """
+    This function plots the results of the simulation, see team_data_plotter() in nbadraftlottery_plotting.py. The
+    plotting module, and seaborn and matplotlib with it, is only imported the first time a plot is drawn.
+    :param team_aggregate_data: a (teams x picks) count matrix, or a dictionary that maps each team to the counts of
+                                the picks they received during the simulation
+    :param team_names: the team for each row of the count matrix
+    :param plot_type: 'strip' for a point per pick, or 'heatmap' for the probability of each pick
+    :param max_points: the most points the strip plot draws, all of them if not given
+    :param output_path: a file to save the plot to instead of showing it
+    """
+    from nbadraftlottery_plotting import team_data_plotter as plotter
+    plotter(team_aggregate_data, team_names, plot_type, max_points, output_path)
+
+
+@_timed('statistics')
+def pick_statistics(pick_count_matrix, percentiles=(25, 50, 75)):
+    """
+    This function works out each team's summary statistics straight from the (teams x picks) count matrix, without
+    building a list with one entry per simulated pick. The mean and standard deviation are weighted by the counts,
+    the highest and lowest picks come from the first and last picks with a nonzero count, and a percentile is the
+    first pick where the running total of counts reaches that percent of the team's lotteries.
+    :param pick_count_matrix: a (teams x picks) array of how many times each team got each pick
+    :param percentiles: the percentiles of each team's pick to work out
+    :return: a dictionary of arrays with one entry per team: 'mean', 'std', 'highest_pick', 'lowest_pick', and
+             'percentiles', a (teams x percentiles) array
+
+    >>> stats = pick_statistics(np.array([[2, 1, 1], [0, 0, 4]]))
+    >>> stats['mean'].tolist(), stats['highest_pick'].tolist(), stats['lowest_pick'].tolist()
+    ([1.75, 3.0], [1, 3], [3, 3])
+
+    >>> stats['percentiles'].tolist()
+    [[1, 1, 2], [3, 3, 3]]
+    """
+    pick_count_matrix = np.asarray(pick_count_matrix)
+    pick_numbers = np.arange(1, pick_count_matrix.shape[1] + 1)
+    totals = pick_count_matrix.sum(axis=1)
+    mean = pick_count_matrix @ pick_numbers / totals
+    variance = (pick_count_matrix * (pick_numbers - mean[:, np.newaxis]) ** 2).sum(axis=1) / totals
+    has_pick = pick_count_matrix > 0
+    running_totals = np.cumsum(pick_count_matrix, axis=1)
+    percentile_picks = np.stack([(running_totals < totals[:, np.newaxis] * q / 100).sum(axis=1) + 1
+                                 for q in percentiles], axis=1)
+    return {'mean': mean, 'std': np.sqrt(variance),
+            'highest_pick': has_pick.argmax(axis=1) + 1,
+            'lowest_pick': pick_count_matrix.shape[1] - has_pick[:, ::-1].argmax(axis=1),
+            'percentiles': percentile_picks}
+
+
+@_timed('summary')
+def team_sim_data(team_info, sim_count, input_from_user, team_names=None):
+    """
+    This function takes our count matrix and uses pick_statistics() to obtain some summary statistics
+    for each team from our simulation. These statistics include: mean pick, standard deviation of pick,
+    highest pick and lowest pick. This function also tests our hypotheses laid out in the readme as well,
+    by adding up the counts of the picks each hypothesis is about.
+    :param team_info: a (teams x picks) count matrix, or a dictionary that maps each team to the counts of the number
+                      of times they obtained each pick
     :param sim_count: the number of times the simulation iterated
     :param input_from_user: a user inputted string expressing what type of simulation this is
+    :param team_names: the team for each row of the count matrix
     """
+    if team_names is None:
+        team_info, team_names = _pick_count_matrix(team_info)
+
     print()
     print('The following statistics summarize our simulations of the NBA Draft Lottery: ')
     print()
-    hypothesis_1_count = 0
-    hypothesis_1_indices = []
-    hypothesis_2_count = 0
-    hypothesis_2_indices = []
-    hypothesis_3_count = 0
-
-    for i in team_info:
-        picks = []
-        for j in team_info[i].items():
-            k = 0
-            while k < int(j[1]):
-                picks.append(j[0])
-                k += 1
-
+    stats = pick_statistics(team_info)
+    for row, i in enumerate(team_names):
         print(i, "simulation statistics: ")
         print()
-        print("Average Pick: " + str(np.mean(picks)))
-        print("Standard Deviation of Picks: " + str(np.std(picks)))
-        print("Lowest Pick: #" + str(np.max(picks)))
-        print("Highest Pick: #" + str(np.min(picks)))
+        print("Average Pick: " + str(stats['mean'][row]))
+        print("Standard Deviation of Picks: " + str(stats['std'][row]))
+        print("Lowest Pick: #" + str(stats['lowest_pick'][row]))
+        print("Highest Pick: #" + str(stats['highest_pick'][row]))
         print()
 
-        if input_from_user == 'r':
-            if (
-                    i == 'Oklahoma City Thunder' or i == 'Cleveland Cavaliers' or i == 'Sacramento Kings' or i == 'Toronto Raptors'):
-                for r, k in enumerate(picks):
-                    if k <= 4 and r not in hypothesis_1_indices:
-                        hypothesis_1_count += 1
-                        hypothesis_1_indices.append(i)
-
-        if input_from_user == 'a':
-            if i == 'Houston Rockets' or i == 'Minnesota Timberwolves' or i == 'Detroit Pistons':
-                for r, k in enumerate(picks):
-                    if k >= 7 and r not in hypothesis_2_indices:
-                        hypothesis_2_count += 1
-                        hypothesis_2_indices.append(i)
-
-        if input_from_user == 'o':
-            if i == 'New York Knicks':
-                for r in picks:
-                    if r == 1:
-                        hypothesis_3_count += 1
+    hypothesis_1_teams = np.isin(team_names, ['Oklahoma City Thunder', 'Cleveland Cavaliers', 'Sacramento Kings',
+                                              'Toronto Raptors'])
+    hypothesis_1_count = team_info[hypothesis_1_teams, :4].sum()
+    hypothesis_2_teams = np.isin(team_names, ['Houston Rockets', 'Minnesota Timberwolves', 'Detroit Pistons'])
+    hypothesis_2_count = team_info[hypothesis_2_teams, 6:].sum()
+    hypothesis_3_count = team_info[np.isin(team_names, ['New York Knicks']), 0].sum()
 
     if input_from_user == 'r' or input_from_user == 'a' or input_from_user == 'o':
         print('___________________')
@@ -508,19 +1727,59 @@ def team_sim_data(team_info, sim_count, input_from_user):
                 print("Hypothesis 3 is: False")
 
 
-def multinomial_simulator(odds, counter):
+def multinomial_simulator(odds, counter, reporter=None, drawn_picks=None, seed=None, league=None):
+    """
+    This function simulates counter whole drafts at once and counts the number of times each pick is awarded to
+    each team. Sampling each team's picks from its own multinomial distribution would ignore that every pick goes to
+    exactly one team, so instead the draft orders are drawn jointly, like in simulate_multinomial_lotteries(), from
+    the odds each team entered the lottery with, which is the first column of its row of odds. Printing the counts
+    is left to a reporter such as print_pick_counts().
+    :param odds: A dictionary that maps each team to a list representing its chances of obtaining picks 1-14
+    :param counter: An integer representing how many drafts should be simulated
+    :param reporter: a function that is given the count matrix and the team names, nothing is reported if not given
+    :param drawn_picks: the number of picks that are drawn before the rest follow the standings, the league's if
+                        not given (the same number odds_creator('m') works the table out with)
+    :param seed: a seed for the numpy random Generator
+    :param league: the LeagueDefinition the odds were made for, the 2021 lottery if not given
+    :return: the (teams x picks) count matrix and the list of team names
+
+    >>> odds, playoff_selected_team, playoff_odds = odds_creator('m', 1, None, None)
+    >>> counts, teams = multinomial_simulator(odds, 100, seed=1)
+    >>> counts.sum(axis=0).tolist() == [100] * 14 and counts.sum(axis=1).tolist() == [100] * 14
+    True
+    """
+    if drawn_picks is None:
+        drawn_picks = (LEAGUE_2021 if league is None else league).drawn_picks
+    team_names = list(odds)
+    team_odds = np.array([odds[team][0] for team in team_names])
+    drawn_picks = min(drawn_picks, int(np.count_nonzero(team_odds > 0)))
+    picks = _gumbel_top_k_picks(np.broadcast_to(team_odds, (counter, len(team_odds))), drawn_picks,
+                                np.random.default_rng(seed))
+    counts = pick_counts(picks)
+    if reporter is not None:
+        reporter(counts, team_names)
+    return counts, team_names
+
+
+def print_pick_counts(counts, team_names):
     """
-    This function iterates through the odds list for each team in the lottery. It then creates a multinomial
-    distribution and simulates the number of times each pick is awarded to each team out of a given number
-    of simulations.
-    :param odds: A list representing a team's chances of obtaining picks 1-14
-    :param counter: An integer representing how many times the simulation should iterate
+    Prints how many times each team got each pick, one line per pick.
+    :param counts: a (teams x picks) count matrix
+    :param team_names: the team for each row of the count matrix
+
+    >>> print_pick_counts(np.array([[1, 0], [0, 1]]), ['Houston Rockets', 'Detroit Pistons'])
+    <BLANKLINE>
+    Houston Rockets Pick 1: 1
+    Houston Rockets Pick 2: 0
+    <BLANKLINE>
+    Detroit Pistons Pick 1: 0
+    Detroit Pistons Pick 2: 1
+    <BLANKLINE>
     """
     print()
-    for i in odds:
-        simulations = multinomial(counter, odds[i])
-        for j in range(len(simulations)):
-            print(i + ' Pick %d: %d ' % (j + 1, simulations[j]))
+    for row, team in enumerate(team_names):
+        for j, count in enumerate(counts[row]):
+            print(team + ' Pick %d: %d' % (j + 1, count))
         print()
 
 
@@ -551,73 +1810,50 @@ def nba_rigging_odds(bernoulli_result):
     :param bernoulli_result: a variable that represents a 0 for a failed attempt or a 1 for a successful attempt
     :return: a list of the odds for each team to win the lottery
     """
-    pacers_odds = 0.1429
-    clippers_odds = 0.1429
-    supersonics_odds = 0.1429
-    hawks_odds = 0.1429
-    kings_odds = 0.1429
-    warriors_odds = 0.1429
+    team_odds = list(LEAGUE_1985.team_odds)  # the Knicks come first, every team starts with the same odds
+    fair_odds = team_odds[0]
 
     if bernoulli_result == 1:
         print('The NBA was not caught attempting to rig the 1985 NBA Draft Lottery')
         mu, sigma = 0.25, 0.1
-        knicks_odds = np.round(np.random.normal(mu, sigma, 1),
+        knicks_odds = np.round(np.random.normal(mu, sigma),
                                3)  # using a normal dist. to determine odds of rigged knicks pick
-        while knicks_odds <= 0 or knicks_odds >= 0.2858 or knicks_odds <= 0.1429:  # knicks should not have non-positive odds or odds that will reduce other teams' odds to negative values
-            knicks_odds = np.round(np.random.normal(mu, sigma, 1), 3)
-        randomizer = random.randint(1, 6)
-        if randomizer == 1:
-            pacers_odds -= (knicks_odds - 0.1429)
-        elif randomizer == 2:
-            clippers_odds -= (knicks_odds - 0.1429)
-        elif randomizer == 3:
-            supersonics_odds -= (knicks_odds - 0.1429)
-        elif randomizer == 4:
-            hawks_odds -= (knicks_odds - 0.1429)
-        elif randomizer == 5:
-            kings_odds -= (knicks_odds - 0.1429)
-        else:
-            warriors_odds -= (knicks_odds - 0.1429)
+        while knicks_odds <= 0 or knicks_odds >= 2 * fair_odds or knicks_odds <= fair_odds:  # knicks should not have non-positive odds or odds that will reduce other teams' odds to negative values
+            knicks_odds = np.round(np.random.normal(mu, sigma), 3)
+        randomizer = random.randint(1, len(team_odds) - 1)
+        team_odds[randomizer] -= (knicks_odds - fair_odds)
         print('The New York Knicks rigged odds are now:', knicks_odds)
         print()
 
     else:
         print('The NBA was caught attempting to rig the 1985 NBA Draft Lottery')
         knicks_odds = 0.01
-        randomizer = random.randint(1, 6)
-        if randomizer == 1:
-            pacers_odds += (0.1429 - knicks_odds)
-        elif randomizer == 2:
-            clippers_odds += (0.1429 - knicks_odds)
-        elif randomizer == 3:
-            supersonics_odds += (0.1429 - knicks_odds)
-        elif randomizer == 4:
-            hawks_odds += (0.1429 - knicks_odds)
-        elif randomizer == 5:
-            kings_odds += (0.1429 - knicks_odds)
-        else:
-            warriors_odds += (0.1429 - knicks_odds)
+        randomizer = random.randint(1, len(team_odds) - 1)
+        team_odds[randomizer] += (fair_odds - knicks_odds)
         print('The New York Knicks odds after punishment are now:', knicks_odds)
         print()
 
-    return [knicks_odds, pacers_odds, clippers_odds, supersonics_odds, hawks_odds, kings_odds, warriors_odds]
+    team_odds[0] = knicks_odds
+    return team_odds
 
 
 def nba_1985_draft_lottery_simulator(team_odds):
     """
     Given the odds for each team, a multinomial distribution is used to determine the 1st pick, then the 2nd pick,
-    and so on, all the way to the fifth pick. Then, the final two picks in the lottery are filled in manually.
+    and so on, for each of the drawn picks of LEAGUE_1985 (the first five). After each pick the odds of the teams
+    that are left are scaled back up to add up to 1, and the list that was passed in is left alone. Then, the picks
+    that are left are filled in manually.
     The resulting pick for each team is then added to a dictionary, in which the key is the team name and the value
     is the pick, and this dictionary is returned.
     :param team_odds: a list representing the odds for all the teams in the lottery of getting the number #1 pick
     :return: a dictionary that maps each team to their pick
     """
-    team_list = ['New York Knicks', 'Indiana Pacers', 'Los Angeles Clippers', 'Seattle SuperSonics', 'Atlanta Hawks',
-                 'Sacramento Kings', 'Golden State Warriors']
+    team_list = list(LOTTERY_1985_TEAMS)
+    team_odds = list(team_odds)
     pick_list = []
     pick_number = 1
-    while pick_number <= 5:
-        simulations = multinomial(1, team_odds)
+    while pick_number <= LEAGUE_1985.drawn_picks:
+        simulations = multinomial(1, np.array(team_odds) / sum(team_odds))
         pick_list.append(team_list[np.argmax(simulations)])
         team_odds.pop(np.argmax(simulations))
         team_list.pop(np.argmax(simulations))
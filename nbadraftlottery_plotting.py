@@ -0,0 +1,61 @@
+# plotting layer of the simulator, kept apart from nbadraftlottery_functions.py so that the simulation itself
+# starts without loading seaborn and matplotlib
+
+import numpy as np
+import seaborn as sns
+import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+
+from nbadraftlottery_functions import TEAM_SHORT_NAMES, _pick_count_matrix
+
+
+def team_data_plotter(team_aggregate_data, team_names=None, plot_type='strip', max_points=None, output_path=None):
+    """
+    This function creates two lists, one that contains each team's names, and one that contains their associated
+    picks from the simulation...these are used to generate a plot that provides a visual understanding of the
+    simulation. The strip plot draws one point per pick, so for big simulations max_points keeps a random
+    subsample of the picks (drawn without replacement from the counts), or plot_type='heatmap' draws each team's
+    chance of each pick straight from the count matrix. If output_path is given, the plot is saved there
+    (the format comes from the extension, e.g. .png or .svg) without needing a display.
+    :param team_aggregate_data: a (teams x picks) count matrix, or a dictionary that maps each team to the counts of
+                                the picks they received during the simulation
+    :param team_names: the team for each row of the count matrix
+    :param plot_type: 'strip' for a point per pick, or 'heatmap' for the probability of each pick
+    :param max_points: the most points the strip plot draws, all of them if not given
+    :param output_path: a file to save the plot to instead of showing it
+    """
+    if team_names is None:
+        team_aggregate_data, team_names = _pick_count_matrix(team_aggregate_data)
+
+    short_team_names = [TEAM_SHORT_NAMES.get(i, i) for i in team_names]
+    pick_numbers = np.arange(1, team_aggregate_data.shape[1] + 1)
+
+    fig_dims = (20, 10)
+    if output_path is None:
+        fig, ax = plt.subplots(figsize=fig_dims)
+    else:
+        fig = Figure(figsize=fig_dims)
+        ax = fig.subplots()
+    print('___________________')
+    print()
+    print("The following plot summarizes our simulations of the NBA Draft Lottery: ")
+    print()
+
+    if plot_type == 'heatmap':
+        probabilities = team_aggregate_data / team_aggregate_data.sum(axis=1, keepdims=True)
+        sns.heatmap(probabilities, annot=True, fmt='.3f', cmap='Blues', xticklabels=pick_numbers,
+                    yticklabels=short_team_names, ax=ax)
+        ax.set_xlabel('Pick')
+    else:
+        team_counts = np.asarray(team_aggregate_data)
+        if max_points is not None and team_counts.sum() > max_points:
+            rng = np.random.default_rng()
+            team_counts = rng.multivariate_hypergeometric(team_counts.ravel(), max_points).reshape(team_counts.shape)
+        x = np.repeat(short_team_names, team_counts.sum(axis=1))
+        y = np.concatenate([np.repeat(pick_numbers, counts) for counts in team_counts])
+        sns.stripplot(x=x, y=y, alpha=0.5, s=10, linewidth=1.0, jitter=True, ax=ax)
+
+    if output_path is None:
+        plt.show()
+    else:
+        fig.savefig(output_path)
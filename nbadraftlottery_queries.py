@@ -0,0 +1,230 @@
+# conditional / what-if queries over stored or exact lottery outcomes
+
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from nbadraftlottery_functions import LEAGUE_2021, _fill_undrawn_picks, read_lottery_results
+
+OutcomeTable = namedtuple('OutcomeTable', ['team_names', 'picks', 'pick_bits', 'weights'])
+
+
+def _outcome_table(team_names, picks, weights):
+    """
+    Builds an OutcomeTable and its bitmask columns: entry [k, i] of pick_bits has bit j set when team i got pick
+    j + 1 in outcome k, so whether a team landed any of a set of picks is one AND against the bitmask of the set.
+    :param team_names: the team for each column
+    :param picks: a (outcomes x teams) array of the pick each team got in each distinct outcome
+    :param weights: the number of lotteries (or the probability) of each outcome
+    :return: a read-only OutcomeTable
+    """
+    if len(team_names) > 64:
+        raise ValueError('outcome tables hold at most 64 teams')
+    picks = np.asarray(picks, dtype=np.int8)
+    pick_bits = np.left_shift(np.uint64(1), (picks - 1).astype(np.uint64))
+    weights = np.asarray(weights, dtype=float)
+    for array in (picks, pick_bits, weights):
+        array.setflags(write=False)
+    return OutcomeTable(tuple(team_names), picks, pick_bits, weights)
+
+
+def exact_outcomes(league=None, team_odds=None, drawn_picks=None, max_outcomes=5000000):
+    """
+    Lists every possible outcome of a lottery with its exact probability. Only the order of the drawn picks can
+    differ, since the other teams follow the standings, so the 2021 lottery has 14 x 13 x 12 x 11 = 24024 outcomes.
+    The draws are extended one pick at a time for all the partial draws at once: each team that is still left gets
+    the next pick with its odds divided by the odds of the teams that are left.
+    :param league: the LeagueDefinition, the 2021 lottery if not given
+    :param team_odds: each team's odds of obtaining the #1 pick, the league's odds if not given
+    :param drawn_picks: the number of picks that are drawn, the league's if not given
+    :param max_outcomes: the most outcomes to list, since drawing every pick has teams! outcomes
+    :return: an OutcomeTable whose weights are the probabilities of the outcomes
+
+    >>> outcomes = exact_outcomes()
+    >>> len(outcomes.weights), round(float(outcomes.weights.sum()), 9)
+    (24024, 1.0)
+    """
+    league = LEAGUE_2021 if league is None else league
+    weights = np.asarray(league.team_odds if team_odds is None else team_odds, dtype=float)
+    drawn_picks = league.drawn_picks if drawn_picks is None else drawn_picks
+    team_count = len(weights)
+    drawable = int(np.count_nonzero(weights > 0))
+    drawn_picks = min(drawn_picks, drawable)
+    outcome_count = int(np.prod(np.arange(drawable - drawn_picks + 1, drawable + 1)))
+    if outcome_count > max_outcomes:
+        raise ValueError('this lottery has %d outcomes, simulate it and use outcomes_from_results() instead'
+                         % outcome_count)
+
+    order = np.zeros((1, 0), dtype=np.int8)
+    taken = np.zeros((1, team_count), dtype=bool)
+    probabilities = np.ones(1)
+    for _ in range(drawn_picks):
+        left_odds = (weights * ~taken).sum(axis=1)
+        chances = probabilities[:, np.newaxis] * weights / left_odds[:, np.newaxis] * ~taken
+        parent, team = np.nonzero(chances)
+        order = np.column_stack([order[parent], team.astype(np.int8)])
+        taken = taken[parent]
+        taken[np.arange(len(team)), team] = True
+        probabilities = chances[parent, team]
+
+    rows = np.arange(len(probabilities))
+    picks = np.zeros((len(probabilities), team_count), dtype=np.int8)
+    for pick_index in range(drawn_picks):
+        picks[rows, order[:, pick_index]] = pick_index + 1
+    _fill_undrawn_picks(picks, taken, drawn_picks)
+    return _outcome_table(league.team_names if len(league.team_names) == team_count else range(team_count), picks,
+                          probabilities)
+
+
+def outcomes_from_results(source, team_names=None, chunk_size=1000000, cache=True):
+    """
+    Compresses stored lotteries into their distinct outcomes and how many times each one happened, which is the
+    index the queries run on. The draw orders are read a chunk at a time (from the memory map of a file written by
+    write_lottery_results(), or from an array), each row is packed into one integer key, and the keys of every chunk
+    are counted and merged. A stored 'r' run only has up to 24024 distinct outcomes however many lotteries it holds,
+    so queries over 100 million stored lotteries only look at a few thousand rows. For a file, the table is saved
+    next to it and reused as long as the file hasn't changed.
+    :param source: the path of a .npy file from write_lottery_results(), or an (iterations x picks) array of the
+                   team index at each pick, like draw_order() returns
+    :param team_names: the team names, needed when source is an array
+    :param chunk_size: the number of lotteries read at a time
+    :param cache: whether to save and reuse the table next to a file
+    :return: an OutcomeTable whose weights are the number of lotteries with each outcome
+
+    >>> from nbadraftlottery_functions import draw_order, simulate_lotteries
+    >>> picks, teams = simulate_lotteries(10000, 'r', seed=3)
+    >>> outcomes = outcomes_from_results(draw_order(picks), teams, chunk_size=4000)
+    >>> int(outcomes.weights.sum()), len(outcomes.weights) <= 24024
+    (10000, True)
+    """
+    cache_path = None
+    if isinstance(source, str):
+        cache_path = os.path.splitext(source)[0] + '.outcomes.npz'
+        if cache and os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(source):
+            with np.load(cache_path) as cached:
+                return _outcome_table(cached['team_names'].tolist(), cached['picks'], cached['weights'])
+        source, team_names = read_lottery_results(source)
+
+    team_count = source.shape[1]
+    if team_count ** team_count >= 2 ** 63:
+        raise ValueError('outcomes_from_results() packs each draw order into 63 bits, which fits up to 15 teams')
+    place_values = team_count ** np.arange(team_count - 1, -1, -1, dtype=np.int64)
+    keys = np.zeros(0, dtype=np.int64)
+    counts = np.zeros(0, dtype=np.int64)
+    for start in range(0, len(source), chunk_size):
+        chunk_keys = np.asarray(source[start:start + chunk_size], dtype=np.int64) @ place_values
+        chunk_keys, chunk_counts = np.unique(chunk_keys, return_counts=True)
+        keys, inverse = np.unique(np.concatenate([keys, chunk_keys]), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate([counts, chunk_counts]),
+                             minlength=len(keys)).astype(np.int64)
+
+    order = (keys[:, np.newaxis] // place_values) % team_count
+    picks = np.empty(order.shape, dtype=np.int8)
+    picks[np.arange(len(order))[:, np.newaxis], order] = np.arange(1, team_count + 1)
+    if cache_path is not None and cache:
+        np.savez(cache_path, team_names=np.array(team_names), picks=picks, weights=counts)
+    return _outcome_table(team_names, picks, counts)
+
+
+def _pick_bitmask(picks):
+    """
+    The bitmask of a pick or a set of picks, with bit j set for pick j + 1.
+    :param picks: a pick number or an iterable of pick numbers
+    :return: a numpy uint64 bitmask
+    """
+    if np.ndim(picks) == 0:
+        picks = [picks]
+    bitmask = 0
+    for pick in picks:
+        bitmask |= 1 << (int(pick) - 1)
+    return np.uint64(bitmask)
+
+
+def outcome_mask(outcomes, condition=None):
+    """
+    Finds the outcomes that meet a condition.
+    :param outcomes: an OutcomeTable
+    :param condition: a dictionary that maps teams to the pick, or list (or range) of picks, they have to land, a
+                      boolean array with one entry per outcome, a function that takes the OutcomeTable and returns
+                      one, or None for every outcome
+    :return: a boolean array with one entry per outcome
+
+    >>> outcomes = exact_outcomes()
+    >>> int(outcome_mask(outcomes, {'Detroit Pistons': 1, 'Orlando Magic': [2, 3]}).sum())
+    264
+    """
+    if condition is None:
+        return np.ones(len(outcomes.weights), dtype=bool)
+    if callable(condition):
+        condition = condition(outcomes)
+    if not isinstance(condition, dict):
+        return np.asarray(condition, dtype=bool)
+
+    mask = np.ones(len(outcomes.weights), dtype=bool)
+    for team, picks in condition.items():
+        column = outcomes.team_names.index(team)
+        mask &= (outcomes.pick_bits[:, column] & _pick_bitmask(picks)) != 0
+    return mask
+
+
+def teams_in_picks(outcomes, teams, picks):
+    """
+    Counts, in every outcome, how many of the given teams landed one of the given picks, for conditions like "two
+    of the bottom three teams fall to picks 5-7".
+    :param outcomes: an OutcomeTable
+    :param teams: a list of team names
+    :param picks: a pick, or a list (or range) of picks
+    :return: an integer array with one entry per outcome
+
+    >>> outcomes = exact_outcomes()
+    >>> bottom_three = ['Houston Rockets', 'Minnesota Timberwolves', 'Detroit Pistons']
+    >>> round(query_probability(outcomes, teams_in_picks(outcomes, bottom_three, range(5, 8)) >= 2), 4)
+    0.4602
+    """
+    bitmask = _pick_bitmask(picks)
+    columns = [outcomes.team_names.index(team) for team in teams]
+    return ((outcomes.pick_bits[:, columns] & bitmask) != 0).sum(axis=1)
+
+
+def query_probability(outcomes, event, given=None):
+    """
+    The probability of an event, or the conditional probability of the event given another condition, over an
+    OutcomeTable from exact_outcomes() or outcomes_from_results().
+    :param outcomes: an OutcomeTable
+    :param event: a condition (see outcome_mask()) describing the event
+    :param given: a condition (see outcome_mask()) to condition on, None for the unconditional probability
+    :return: the probability
+
+    >>> outcomes = exact_outcomes()
+    >>> round(query_probability(outcomes, {'Orlando Magic': 2}, given={'Detroit Pistons': 1}), 4)
+    0.1453
+    """
+    given_mask = outcome_mask(outcomes, given)
+    given_weight = outcomes.weights[given_mask].sum()
+    if given_weight == 0:
+        raise ValueError('no outcome meets the given condition')
+    return float(outcomes.weights[given_mask & outcome_mask(outcomes, event)].sum() / given_weight)
+
+
+def conditional_pick_probabilities(outcomes, given=None):
+    """
+    Every team's chance of every pick given a condition, such as "given the Pistons get #1".
+    :param outcomes: an OutcomeTable
+    :param given: a condition (see outcome_mask()) to condition on, None for the unconditional probabilities
+    :return: a (teams x picks) array where entry [i, j] is the probability that team i gets pick j + 1
+
+    >>> outcomes = exact_outcomes()
+    >>> probabilities = conditional_pick_probabilities(outcomes, {'Detroit Pistons': 1})
+    >>> magic = outcomes.team_names.index('Orlando Magic')
+    >>> np.round(probabilities[magic, :6], 3).tolist()
+    [0.0, 0.145, 0.14, 0.134, 0.135, 0.333]
+    """
+    mask = outcome_mask(outcomes, given)
+    weights = outcomes.weights[mask]
+    if weights.sum() == 0:
+        raise ValueError('no outcome meets the given condition')
+    team_count = len(outcomes.team_names)
+    cells = (outcomes.picks[mask].astype(np.intp) - 1) + team_count * np.arange(team_count)
+    counts = np.bincount(cells.ravel(), weights=np.repeat(weights, team_count), minlength=team_count * team_count)
+    return counts.reshape(team_count, team_count) / weights.sum()
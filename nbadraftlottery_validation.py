@@ -0,0 +1,276 @@
+# statistical validation of the simulation engines: python nbadraftlottery_validation.py --iterations 1e6
+
+import argparse
+import sys
+from functools import lru_cache
+from math import exp, lgamma, log
+from statistics import NormalDist
+
+import numpy as np
+
+from nbadraftlottery_functions import (LEAGUE_1985, LEAGUE_2021, _simulation_batch, _wild_card_donors,
+                                       exact_pick_probabilities, lottery_config, pick_counts, wild_card_draw)
+
+VALIDATED_MODES = ('r', 'a', 'w', 'm', 'o')
+
+
+def chi_square_p_value(statistic, degrees):
+    """
+    The chance that a chi-square random variable with the given degrees of freedom is at least the statistic, worked
+    out from the regularized incomplete gamma function (a series below the mean and a continued fraction above it),
+    so that scipy isn't needed.
+    :param statistic: the chi-square (or G) statistic
+    :param degrees: the degrees of freedom
+    :return: the p-value
+
+    >>> round(chi_square_p_value(3.841, 1), 3), round(chi_square_p_value(18.307, 10), 3)
+    (0.05, 0.05)
+    """
+    if degrees <= 0 or statistic <= 0:
+        return 1.0
+    a, x = degrees / 2, statistic / 2
+    scale = exp(-x + a * log(x) - lgamma(a))
+    if x < a + 1:
+        term = total = 1 / a
+        n = a
+        while abs(term) > abs(total) * 1e-15:
+            n += 1
+            term *= x / n
+            total += term
+        return max(0.0, 1 - total * scale)
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1 / tiny
+    d = 1 / b
+    fraction = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1 / d
+        fraction *= d * c
+        if abs(d * c - 1) < 1e-15:
+            break
+    return scale * fraction
+
+
+def goodness_of_fit(observed, probabilities, min_expected=5):
+    """
+    Pearson's chi-square test and the G-test of one team's pick counts against its exact pick probabilities. Picks
+    that are expected fewer than min_expected times are pooled into one cell so the tests stay valid, and a pick
+    that happened even though its probability is 0 is counted as impossible.
+    :param observed: an array of how many times the team got each pick
+    :param probabilities: an array of the team's exact chance of each pick
+    :param min_expected: the smallest expected count a pick can have without being pooled
+    :return: a dictionary with the 'chi_square' and 'g' statistics, their 'degrees' of freedom, their p-values
+             'chi_square_p' and 'g_p', and the number of 'impossible' results
+
+    >>> result = goodness_of_fit(np.array([52, 48, 0]), np.array([0.5, 0.5, 0]))
+    >>> round(result['chi_square'], 2), result['degrees'], result['impossible']
+    (0.16, 1, 0)
+    """
+    observed = np.asarray(observed, dtype=float)
+    expected = observed.sum() * np.asarray(probabilities, dtype=float)
+    impossible = int(observed[expected == 0].sum())
+
+    small = (expected > 0) & (expected < min_expected)
+    large = expected >= min_expected
+    cells_observed = list(observed[large])
+    cells_expected = list(expected[large])
+    if small.any():
+        cells_observed.append(observed[small].sum())
+        cells_expected.append(expected[small].sum())
+    cells_observed = np.array(cells_observed)
+    cells_expected = np.array(cells_expected)
+
+    chi_square = float(((cells_observed - cells_expected) ** 2 / cells_expected).sum())
+    seen = cells_observed > 0
+    g = float(2 * (cells_observed[seen] * np.log(cells_observed[seen] / cells_expected[seen])).sum())
+    degrees = len(cells_observed) - 1
+    return {'chi_square': chi_square, 'g': g, 'degrees': degrees,
+            'chi_square_p': chi_square_p_value(chi_square, degrees), 'g_p': chi_square_p_value(g, degrees),
+            'impossible': impossible}
+
+
+def _odds_variants(simulation_type, league, wild_card):
+    """
+    The official odds of every version of a lottery that the engine chooses between with equal chances: one for the
+    'r', 'a' and 'm' simulations, and one for each team that can give up odds to the wild card in the 'w' simulation.
+    :param simulation_type: 'r', 'a', 'w' or 'm'
+    :param league: the LeagueDefinition
+    :param wild_card: the wild-card playoff team and its odds for the 'w' simulation
+    :return: a list of lists of odds
+    """
+    team_odds = list(league.team_odds)
+    if simulation_type != 'w':
+        return [team_odds]
+    variants = []
+    for donor in _wild_card_donors(team_odds, wild_card[1]):
+        donor_odds = team_odds + [wild_card[1]]
+        donor_odds[donor] -= wild_card[1]
+        variants.append(donor_odds)
+    return variants
+
+
+def official_pick_probabilities(simulation_type, league=None, wild_card=None):
+    """
+    The exact chance of every team landing every pick under the official odds, which is what the engine for the
+    simulation type has to reproduce.
+    :param simulation_type: 'r', 'a', 'w', 'm' or 'o'
+    :param league: the LeagueDefinition, the 2021 lottery if not given
+    :param wild_card: the wild-card playoff team and its odds for the 'w' simulation
+    :return: a (teams x picks) array of probabilities
+
+    >>> np.round(official_pick_probabilities('r')[0, :4], 3).tolist()
+    [0.14, 0.134, 0.127, 0.12]
+    """
+    if simulation_type == 'o':
+        return rigged_pick_probabilities()
+    league = LEAGUE_2021 if league is None else league
+    variants = _odds_variants(simulation_type, league, wild_card)
+    drawn_picks = len(variants[0]) if simulation_type == 'a' else league.drawn_picks
+    return sum(exact_pick_probabilities(odds, drawn_picks) for odds in variants) / len(variants)
+
+
+def engine_pick_probabilities(simulation_type, league=None, wild_card=None):
+    """
+    The exact chance of every team landing every pick given the ball combinations the engine actually assigns, so
+    after the odds have been turned into whole numbers of combinations and the leftover combinations are redrawn.
+    :param simulation_type: 'r', 'a' or 'w'
+    :param league: the LeagueDefinition, the 2021 lottery if not given
+    :param wild_card: the wild-card playoff team and its odds for the 'w' simulation
+    :return: a (teams x picks) array of probabilities
+    """
+    config = lottery_config(simulation_type, wild_card=wild_card, league=league)
+    rows = [exact_pick_probabilities(counts.astype(float), config.drawn_picks)
+            for counts in config.combination_counts]
+    return sum(rows) / len(rows)
+
+
+def truncation_bias(simulation_type='r', league=None, wild_card=None):
+    """
+    Flags the bias that comes from handing each team int(odds * 1000) ball combinations. When the odds don't turn
+    into whole numbers of combinations, some combinations are left unassigned and redrawn, which shifts every team's
+    chances a little away from the official odds.
+    :param simulation_type: 'r', 'a' or 'w'
+    :param league: the LeagueDefinition, the 2021 lottery if not given
+    :param wild_card: the wild-card playoff team and its odds for the 'w' simulation
+    :return: a dictionary with the number of 'unassigned' combinations in each version of the lottery and the
+             largest difference between the engine's and the official chance of any team landing any pick
+
+    >>> truncation_bias('r')['max_probability_error'] < 1e-12
+    True
+
+    >>> from nbadraftlottery_functions import LeagueDefinition
+    >>> sevenths = LEAGUE_2021._replace(team_odds=(1 / 7,) * 7 + (0,) * 7)
+    >>> report = truncation_bias('r', sevenths)
+    >>> report['unassigned'], report['max_probability_error'] < 1e-12
+    ([6], True)
+    """
+    config = lottery_config(simulation_type, wild_card=wild_card, league=league)
+    assignable = config.combination_lookup.shape[1] - len(config.excluded_combinations)
+    unassigned = [int(assignable - counts.sum()) for counts in config.combination_counts]
+    error = np.abs(engine_pick_probabilities(simulation_type, league, wild_card)
+                   - official_pick_probabilities(simulation_type, league, wild_card)).max()
+    return {'unassigned': unassigned, 'max_probability_error': float(error)}
+
+
+@lru_cache(maxsize=1)
+def rigged_pick_probabilities():
+    """
+    The exact chance of every team landing every pick in the 'o' simulation. The Knicks' rigged odds are rounded to
+    three decimals, so they only take the values 0.143 to 0.285, and the chance of each value comes from the normal
+    distribution they are drawn from. Every value, and every team that can make up the difference, is then solved
+    exactly and weighted by its chance.
+    :return: a (teams x picks) array of probabilities
+    """
+    fair_odds = LEAGUE_1985.team_odds[0]
+    team_count = len(LEAGUE_1985.team_odds)
+    knicks_draw = NormalDist(0.25, 0.1)
+    outcomes = [(0.3, 0.01)]  # (chance, Knicks odds), the rigging is caught 30% of the time
+    thousandths = [k for k in range(1, 1000) if fair_odds < k / 1000 < 2 * fair_odds]
+    weights = [knicks_draw.cdf((k + 0.5) / 1000) - knicks_draw.cdf((k - 0.5) / 1000) for k in thousandths]
+    outcomes += [(0.7 * weight / sum(weights), k / 1000) for k, weight in zip(thousandths, weights)]
+
+    probabilities = np.zeros((team_count, team_count))
+    for chance, knicks_odds in outcomes:
+        for donor in range(1, team_count):
+            team_odds = list(LEAGUE_1985.team_odds)
+            team_odds[donor] -= knicks_odds - fair_odds
+            team_odds[0] = knicks_odds
+            probabilities += chance / (team_count - 1) * exact_pick_probabilities(team_odds, LEAGUE_1985.drawn_picks)
+    return probabilities
+
+
+def validate_engine(simulation_type, iterations=1000000, seed=0, alpha=0.001, league=None):
+    """
+    Runs one engine for many lotteries and tests every team's pick counts against the official pick probabilities
+    with chi-square and G-tests. The significance level is split between the tests (a Bonferroni correction), so a
+    correct engine fails the whole check with a chance of about alpha, and the same seed always gives the same
+    answer.
+    :param simulation_type: one of VALIDATED_MODES
+    :param iterations: the number of lotteries to simulate
+    :param seed: a seed for the simulation, and for the wild card in the 'w' simulation
+    :param alpha: the chance of failing a correct engine
+    :param league: the LeagueDefinition to simulate, the 2021 lottery if not given ('o' is always 1985)
+    :return: a dictionary with the 'mode', 'iterations', whether it 'passed', the 'truncation' report and a list of
+             the test results of each of the 'teams'
+
+    >>> validate_engine('r', iterations=20000, seed=1)['passed']
+    True
+    """
+    wild_card = wild_card_draw(seed, league) if simulation_type == 'w' else None
+    picks, team_names = _simulation_batch(iterations, simulation_type, seed, wild_card, league)
+    counts = pick_counts(picks)
+    probabilities = official_pick_probabilities(simulation_type, league, wild_card)
+
+    threshold = alpha / (2 * len(team_names))
+    teams = []
+    for row, team in enumerate(team_names):
+        result = goodness_of_fit(counts[row], probabilities[row])
+        result['team'] = team
+        result['passed'] = (result['impossible'] == 0 and result['chi_square_p'] >= threshold
+                            and result['g_p'] >= threshold)
+        teams.append(result)
+
+    truncation = None  # the 'm' and 'o' engines draw from the odds directly, without ball combinations
+    if simulation_type in ('r', 'a', 'w'):
+        truncation = truncation_bias(simulation_type, league, wild_card)
+    return {'mode': simulation_type, 'iterations': iterations, 'wild_card': wild_card, 'truncation': truncation,
+            'passed': all(result['passed'] for result in teams), 'teams': teams}
+
+
+def main(argv=None):
+    """
+    Validates every engine from the command line and prints the worst test of each.
+    :param argv: the command line arguments, sys.argv if not given
+    :return: the exit status, 1 if any engine failed
+    """
+    parser = argparse.ArgumentParser(prog='python nbadraftlottery_validation.py',
+                                     description='validates the simulation engines against exact probabilities')
+    parser.add_argument('--modes', nargs='+', choices=VALIDATED_MODES, default=list(VALIDATED_MODES))
+    parser.add_argument('--iterations', type=lambda value: int(float(value)), default=1000000,
+                        help='number of lotteries to simulate for each engine, e.g. 1e6')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the simulations')
+    parser.add_argument('--alpha', type=float, default=0.001, help='chance of failing a correct engine')
+    args = parser.parse_args(argv)
+
+    all_passed = True
+    for mode in args.modes:
+        report = validate_engine(mode, args.iterations, args.seed, args.alpha)
+        worst = min(report['teams'], key=lambda result: min(result['chi_square_p'], result['g_p']))
+        print('%s  mode %s: worst team %s, chi-square p = %.3g, G p = %.3g'
+              % ('PASS' if report['passed'] else 'FAIL', mode, worst['team'], worst['chi_square_p'], worst['g_p']))
+        if report['truncation'] is not None and max(report['truncation']['unassigned']) > 0:
+            print('      %s combination(s) unassigned by int(odds * 1000), largest pick probability error %.2g'
+                  % (report['truncation']['unassigned'], report['truncation']['max_probability_error']))
+        all_passed = all_passed and report['passed']
+    return 0 if all_passed else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())